@@ -1,4 +1,7 @@
 from data_model import Base
+from database.partitioning import (PARTITION_TABLES, PARTITION_KEYS, PARTITION_FIRST_YEAR,
+                                   create_year_partitions, create_partition_indexes)
+from datetime import date
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
 import os
@@ -21,3 +24,11 @@ engine = create_engine(DATABASE_URL, echo=True)
 
 # Create tables
 Base.metadata.create_all(engine)
+
+# Create the yearly partitions and indexes of the partitioned tables
+if PARTITION_TABLES:
+    with engine.begin() as connection:
+        for table_name in PARTITION_KEYS:
+            create_year_partitions(connection, table_name, range(
+                PARTITION_FIRST_YEAR, date.today().year + 1))
+            create_partition_indexes(connection, table_name)
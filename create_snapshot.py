@@ -0,0 +1,17 @@
+import argparse
+from database.session_factory import SessionFactory
+from data_processing.snapshot import export_snapshot
+
+# Export the lifetime data to Parquet/Arrow files for offline analysis
+parser = argparse.ArgumentParser(
+    description="Export a snapshot of the lifetime data for offline analysis.")
+parser.add_argument("directory", help="Empty directory to write the snapshot to")
+args = parser.parse_args()
+
+session = SessionFactory.reader()
+try:
+    export_snapshot(session, args.directory)
+except ValueError as error:
+    parser.error(str(error))
+finally:
+    session.close()
@@ -1,13 +1,17 @@
 from dataclasses import dataclass
+import logging
 import data_model as data_model
 from uuid import uuid4
 from database.session_factory import SessionFactory
-from typing import Dict, List, Union
-from datetime import datetime
-from sqlalchemy import func, text
-from datetime import datetime
-from models.distribution_fitter import fit_distributions_to_data
+from database.partitioning import ensure_partitions
+from typing import Dict, List, Optional, Tuple, Union
+from datetime import date, datetime
+import calendar
+from sqlalchemy import bindparam, func, text
+from models.distribution_fitter import fit_distributions_to_arrays, fit_distributions_to_data
 from data_processing.lifetime_processor import LifetimeProcessor
+from data_processing.lifetime_window import LifetimeWindowSweep
+from data_processing.snapshot import SnapshotReader
 from statistical_tests.ks_test import calculate_ks_statistic
 from statistical_tests.bootstrap_handler import bootstrap_p_value
 
@@ -16,7 +20,15 @@ from statistical_tests.bootstrap_handler import bootstrap_p_value
 class ComponentDataHandler:
     """
     Data handler class for managing various entities related to components.
+
+    When snapshot_directory is set, the handler runs in offline mode: lifetimes are read from
+    the snapshot created by create_snapshot.py instead of from the database.
     """
+    snapshot_directory: Optional[str] = None
+
+    def __post_init__(self):
+        self._snapshot = SnapshotReader(
+            self.snapshot_directory) if self.snapshot_directory else None
 
     def _parse_date(self, date_string: str) -> datetime.date:
         """Helper function to parse date in DD/MM/YYYY or DD-MM-YYYY format."""
@@ -50,6 +62,7 @@ class ComponentDataHandler:
                 session.add(new_object)
 
         session.commit()
+        SessionFactory.mark_written(session)
 
     def upsert_failure_type_codes(self, type_codes_list: List[Dict[str, str]]):
         """
@@ -73,6 +86,7 @@ class ComponentDataHandler:
                 session.add(new_code)
 
         session.commit()
+        SessionFactory.mark_written(session)
 
     def upsert_maintenance_groups(self, groups_list: List[Dict[str, str]]):
         """
@@ -96,6 +110,7 @@ class ComponentDataHandler:
                 session.add(new_group)
 
         session.commit()
+        SessionFactory.mark_written(session)
 
     def upsert_malfunctions(self, malfunctions_list: List[Dict[str, str]]):
         """
@@ -103,6 +118,17 @@ class ComponentDataHandler:
         ...
         """
         session = SessionFactory()
+
+        # Make sure the partitions for the ingested dates exist (only when partitioning is enabled)
+        ensure_partitions(session, [malfunction_dict.get("EventDate")
+                          for malfunction_dict in malfunctions_list])
+
+        # Objects and previous failure types of the upserted malfunctions, to refresh the lifetime summary
+        touched_object_ids = set()
+        previous_failure_type_ids = set()
+        # Earliest event date per failure type of the upserted malfunctions, to refresh the failure rate history
+        touched_failure_dates = {}
+
         for malfunction_dict in malfunctions_list:
 
             # Fetch related records and their IDs
@@ -126,7 +152,15 @@ class ComponentDataHandler:
 
             existing_malfunction = session.query(data_model.MalfunctionRecord).filter_by(
                 MalfunctionNumber=malfunction_dict["MalfunctionNumber"]).first()
+            touched_object_ids.add(object_code.ID)
+            touched_failures = [
+                (malfunction_dict["FailureTypeCodeID"], malfunction_dict["EventDate"])]
             if existing_malfunction:
+                touched_object_ids.add(existing_malfunction.ObjectCodeID)
+                previous_failure_type_ids.add(
+                    existing_malfunction.FailureTypeCodeID)
+                touched_failures.append(
+                    (existing_malfunction.FailureTypeCodeID, existing_malfunction.EventDate))
                 existing_malfunction.Description = malfunction_dict["Description"]
                 existing_malfunction.LastTestDate = malfunction_dict["LastTestDate"]
                 existing_malfunction.EventDate = malfunction_dict["EventDate"]
@@ -139,22 +173,274 @@ class ComponentDataHandler:
                     **malfunction_dict)
                 session.add(new_malfunction)
 
+            for failure_type_id, event_date in touched_failures:
+                if failure_type_id is not None:
+                    touched_failure_dates[failure_type_id] = min(
+                        event_date, touched_failure_dates.get(failure_type_id, event_date))
+
         session.commit()
 
         # Update the lifetimes
         function_query = text("SELECT update_object_lifetimes()")
         session.execute(function_query)
 
+        # Refresh the lifetime summary of every failure type with malfunctions on the touched objects,
+        # since their lifetimes may have changed
+        failure_type_ids = previous_failure_type_ids | {row[0] for row in session.query(
+            data_model.MalfunctionRecord.FailureTypeCodeID).filter(
+            data_model.MalfunctionRecord.ObjectCodeID.in_(touched_object_ids)).distinct()}
+        self._refresh_lifetime_summaries(session, failure_type_ids)
+
+        # Refresh the failure rate history of the touched failure types from the earliest touched month
+        if touched_failure_dates:
+            self._refresh_failure_rate_history(
+                session, list(touched_failure_dates), min(touched_failure_dates.values()))
+
+        session.commit()
+        SessionFactory.mark_written(session)
+
+    def refresh_lifetime_summaries(self, failure_type_ids: Optional[List[str]] = None):
+        """
+        Recompute the FailureTypeLifetimeSummary table, e.g. to fill it for an existing database.
+
+        :param failure_type_ids: IDs of the failure types to refresh, all failure types if omitted.
+        """
+        session = SessionFactory()
+        if failure_type_ids is None:
+            failure_type_ids = [
+                row[0] for row in session.query(data_model.FailureTypeCode.ID)]
+        self._refresh_lifetime_summaries(session, failure_type_ids)
+        session.commit()
+        SessionFactory.mark_written(session)
+        session.close()
+
+    @staticmethod
+    def _refresh_lifetime_summaries(session, failure_type_ids):
+        """
+        Replace the FailureTypeLifetimeSummary rows of the given failure types by lifetimes
+        derived from MalfunctionRecord and ObjectLifetime.
+        """
+        failure_type_ids = [
+            failure_type_id for failure_type_id in failure_type_ids if failure_type_id is not None]
+        if not failure_type_ids:
+            return
+
+        session.query(data_model.FailureTypeLifetimeSummary).filter(
+            data_model.FailureTypeLifetimeSummary.FailureTypeCodeID.in_(failure_type_ids)).delete(
+            synchronize_session=False)
+
+        # Date differences are whole days in PostgreSQL, converted to hours
+        summary_query = text("""
+            INSERT INTO "FailureTypeLifetimeSummary"
+                ("FailureTypeCodeID", "ObjectLifetimeID", "ObjectCodeID", "StartHours",
+                 "LifetimeHours", "IntervalStartHours", "IntervalEndHours", "Observable")
+            SELECT observed."FailureTypeCodeID", ol."ID", ol."ObjectCodeID",
+                   (ol."StartDate" - CAST(:epoch AS date)) * 24.0,
+                   (ol."EndDate" - ol."StartDate") * 24.0,
+                   (ol."IntervalStart" - ol."StartDate") * 24.0,
+                   (ol."IntervalEnd" - ol."StartDate") * 24.0,
+                   observed."Observable"
+            FROM (
+                SELECT DISTINCT "FailureTypeCodeID", "ObjectCodeID",
+                       bool_or("Observable") OVER (PARTITION BY "FailureTypeCodeID") AS "Observable"
+                FROM "MalfunctionRecord"
+                WHERE "FailureTypeCodeID" IN :failure_type_ids
+            ) AS observed
+            JOIN "ObjectLifetime" AS ol ON ol."ObjectCodeID" = observed."ObjectCodeID"
+        """).bindparams(bindparam("failure_type_ids", expanding=True))
+        session.execute(summary_query, {
+            "epoch": data_model.LIFETIME_EPOCH, "failure_type_ids": failure_type_ids})
+
+    def refresh_failure_rate_history(self, failure_type_ids: Optional[List[str]] = None):
+        """
+        Recompute the FailureTypeCodeChangeHistory table, e.g. to fill it for an existing database.
+
+        :param failure_type_ids: IDs of the failure types to refresh, all failure types if omitted.
+        """
+        session = SessionFactory()
+        if failure_type_ids is None:
+            failure_type_ids = [
+                row[0] for row in session.query(data_model.FailureTypeCode.ID)]
+        self._refresh_failure_rate_history(session, failure_type_ids)
         session.commit()
+        SessionFactory.mark_written(session)
+        session.close()
 
     @staticmethod
-    def calculate_lifetimes(failure_type_code: str, num_objects: int, end_observation_period: datetime) -> List[Union[float, List[float]]]:
+    def _refresh_failure_rate_history(session, failure_type_ids, from_date: Optional[date] = None):
+        """
+        Replace the monthly FailureTypeCodeChangeHistory rows of the given failure types from the month
+        of from_date onwards (all months if omitted).
+
+        Each row covers one calendar month with at least one failure, from StartDate up to (excluding)
+        EndDate. FailureFrequency is the number of failures in the month and NumberOfComponents the
+        number of distinct components that had a failure of the type up to the end of the month.
+        The rows before the month of from_date are kept and assumed to be up to date.
+        """
+        failure_type_ids = [
+            failure_type_id for failure_type_id in failure_type_ids if failure_type_id is not None]
+        if not failure_type_ids:
+            return
+        from_month = from_date.replace(day=1) if from_date else date.min
+
+        session.query(data_model.FailureTypeCodeChangeHistory).filter(
+            data_model.FailureTypeCodeChangeHistory.FailureTypeCodeID.in_(failure_type_ids),
+            data_model.FailureTypeCodeChangeHistory.StartDate >= from_month).delete(
+            synchronize_session=False)
+
+        # The malfunctions from from_month onwards are read once and the running component count continues
+        # from the last kept row. Earlier malfunctions are only checked for the components failing since
+        # from_month, which count as new if they had no earlier failure of the type
+        history_query = text("""
+            INSERT INTO "FailureTypeCodeChangeHistory"
+                ("ID", "FailureTypeCodeID", "FailureFrequency", "NumberOfComponents", "StartDate", "EndDate")
+            WITH recent_failures AS MATERIALIZED (
+                SELECT "FailureTypeCodeID", "ObjectCodeID",
+                       CAST(date_trunc('month', "EventDate") AS date) AS "Month"
+                FROM "MalfunctionRecord"
+                WHERE "FailureTypeCodeID" IN :failure_type_ids AND "EventDate" >= :from_month
+            ), monthly_failures AS (
+                SELECT "FailureTypeCodeID", "Month", count(*) AS "Failures"
+                FROM recent_failures
+                GROUP BY "FailureTypeCodeID", "Month"
+            ), first_failures AS (
+                SELECT r."FailureTypeCodeID", min(r."Month") AS "Month"
+                FROM recent_failures AS r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM "MalfunctionRecord" AS earlier
+                    WHERE earlier."FailureTypeCodeID" IN :failure_type_ids AND earlier."EventDate" < :from_month
+                      AND earlier."FailureTypeCodeID" = r."FailureTypeCodeID"
+                      AND earlier."ObjectCodeID" = r."ObjectCodeID")
+                GROUP BY r."FailureTypeCodeID", r."ObjectCodeID"
+            ), monthly_new_components AS (
+                SELECT "FailureTypeCodeID", "Month", count(*) AS "NewComponents"
+                FROM first_failures
+                GROUP BY "FailureTypeCodeID", "Month"
+            ), previous_components AS (
+                SELECT DISTINCT ON ("FailureTypeCodeID") "FailureTypeCodeID", "NumberOfComponents"
+                FROM "FailureTypeCodeChangeHistory"
+                WHERE "FailureTypeCodeID" IN :failure_type_ids AND "StartDate" < :from_month
+                ORDER BY "FailureTypeCodeID", "StartDate" DESC
+            )
+            SELECT gen_random_uuid()::text, f."FailureTypeCodeID", f."Failures",
+                   coalesce(p."NumberOfComponents", 0) + sum(coalesce(n."NewComponents", 0)) OVER (
+                       PARTITION BY f."FailureTypeCodeID" ORDER BY f."Month"),
+                   f."Month", CAST(f."Month" + INTERVAL '1 month' AS date)
+            FROM monthly_failures AS f
+            LEFT JOIN monthly_new_components AS n
+                ON n."FailureTypeCodeID" = f."FailureTypeCodeID" AND n."Month" = f."Month"
+            LEFT JOIN previous_components AS p ON p."FailureTypeCodeID" = f."FailureTypeCodeID"
+        """).bindparams(bindparam("failure_type_ids", expanding=True))
+        session.execute(history_query, {
+            "failure_type_ids": failure_type_ids, "from_month": from_month})
+
+    def get_rolling_failure_rates(self, failure_type_code: str, start: date, end: date,
+                                  window_months: int = 12, num_objects: Optional[int] = None) -> List[dict]:
+        """
+        Calculate rolling failure rates per month from start to end, from the FailureTypeCodeChangeHistory aggregates.
+
+        For each month the failures in the window of window_months months ending with that month are
+        counted. The failure rate is expressed in failures per year, and per component per year when
+        the population size num_objects is given. The number of components with a failure of the type
+        so far is reported as well, but is not a population and not used for the rates.
+        """
+        if window_months < 1:
+            raise ValueError("window_months should be at least 1")
+
+        session = SessionFactory.reader()
+
+        failure_type = session.query(data_model.FailureTypeCode).filter(
+            func.lower(data_model.FailureTypeCode.Code) == failure_type_code.lower()).first()
+
+        if not failure_type:
+            session.close()
+            raise ValueError("FailureTypeCode not found")
+
+        history = data_model.FailureTypeCodeChangeHistory
+        first_month = start.replace(day=1)
+        last_month = end.replace(day=1)
+        first_window_start = self._add_months(first_month, 1 - window_months)
+
+        # Monthly aggregates within the windows, plus the last month before them for the failed component count
+        rows = session.query(history).filter(
+            history.FailureTypeCodeID == failure_type.ID,
+            history.StartDate >= first_window_start,
+            history.StartDate <= last_month).order_by(history.StartDate).all()
+        previous_row = session.query(history).filter(
+            history.FailureTypeCodeID == failure_type.ID,
+            history.StartDate < first_window_start).order_by(history.StartDate.desc()).first()
+
+        session.close()
+
+        failures_per_month = {row.StartDate: int(row.FailureFrequency) for row in rows}
+        components_per_month = {row.StartDate: row.NumberOfComponents for row in rows}
+        components = previous_row.NumberOfComponents if previous_row else 0
+        window_years = window_months / 12.0
+
+        # Carry the failed component count forward through months without failures
+        for month in self.observation_period_range(first_window_start, first_month):
+            components = components_per_month.get(month, components)
+
+        rates = []
+        for month in self.observation_period_range(first_month, last_month):
+            components = components_per_month.get(month, components)
+            window_start = self._add_months(month, 1 - window_months)
+            failures = sum(failures_per_month.get(window_month, 0)
+                           for window_month in self.observation_period_range(window_start, month))
+
+            rates.append({
+                "period_start": window_start,
+                "period_end": self._add_months(month, 1),
+                "number_of_failures": failures,
+                "number_of_failed_components": components,
+                "number_of_objects": num_objects,
+                "failure_rate": failures / window_years,
+                "failure_rate_per_component": failures / window_years / num_objects if num_objects else None
+            })
+        return rates
+
+    def calculate_lifetimes(self, failure_type_code: str, num_objects: int, end_observation_period: datetime) -> List[Union[float, List[float]]]:
         """
         Calculate lifetimes based on the provided failure type code, number of objects, and observation period.
+        Lifetimes that end after the observation period are right-censored at its end.
         Returns a list of lifetimes (in hours) for each object.
         """
-        session = SessionFactory()
+        if self._snapshot is not None:
+            return self._snapshot.calculate_lifetimes(failure_type_code, num_objects, end_observation_period)
+
+        session = SessionFactory.reader()
+        summaries, earliest_lifetime_start = self._load_lifetime_summaries(
+            session, failure_type_code, end_observation_period)
+        # Close the database session
+        session.close()
+
+        return self._lifetime_window_sweep(summaries, earliest_lifetime_start, num_objects).lifetimes(
+            self._hours_since_epoch(end_observation_period))
+
+    def _lifetime_window_sweep(self, summaries, earliest_lifetime_start: Optional[date],
+                               num_objects: int) -> LifetimeWindowSweep:
+        """Prepare the observation windows over the summary rows of _load_lifetime_summaries."""
+        start_hours, lifetime_hours, interval_start_hours, interval_end_hours, object_ids, observable = \
+            list(zip(*summaries)) or [()] * 6
+        return LifetimeWindowSweep(
+            start_hours, lifetime_hours, interval_start_hours, interval_end_hours, object_ids,
+            # Check for Observable Malfunctions
+            any(observable),
+            num_objects,
+            self._hours_since_epoch(
+                earliest_lifetime_start) if earliest_lifetime_start else None)
+
+    @staticmethod
+    def _hours_since_epoch(value: date) -> float:
+        """Returns the number of hours between LIFETIME_EPOCH and the date."""
+        return (value - data_model.LIFETIME_EPOCH).total_seconds() / 3600.0
 
+    def _load_lifetime_summaries(self, session, failure_type_code: str, end_observation_period: date):
+        """
+        Fetch the precomputed lifetimes of a failure type that started within the observation period,
+        as (StartHours, LifetimeHours, IntervalStartHours, IntervalEndHours, ObjectCodeID, Observable)
+        rows, together with the earliest lifetime start.
+        """
         # Convert the failure type code to lowercase for case insensitivity
         failure_type_code = failure_type_code.lower()
 
@@ -166,101 +452,120 @@ class ComponentDataHandler:
             session.close()
             raise ValueError("FailureTypeCode not found")
 
-        # Fetch Malfunctions with the given FailureTypeCode ID
-        malfunctions = session.query(data_model.MalfunctionRecord).filter_by(
-            FailureTypeCodeID=failure_type.ID).all()
+        # One range read on the (FailureTypeCodeID, StartHours) index, of only the columns of the windows as tuples
+        summary = data_model.FailureTypeLifetimeSummary
+        summaries = session.query(
+            summary.StartHours, summary.LifetimeHours, summary.IntervalStartHours,
+            summary.IntervalEndHours, summary.ObjectCodeID, summary.Observable).filter(
+            summary.FailureTypeCodeID == failure_type.ID,
+            summary.StartHours <= self._hours_since_epoch(end_observation_period)).all()
 
-        object_ids = [m.ObjectCodeID for m in malfunctions]
-
-        # Get the corresponding ObjectLifetime records
-        object_lifetimes = session.query(data_model.ObjectLifetime).filter(
-            data_model.ObjectLifetime.ObjectCodeID.in_(object_ids)).all()
+        # The StartDate filter lets PostgreSQL prune the partitions after the observation period
         earliest_lifetime_start = session.query(
-            func.min(data_model.ObjectLifetime.StartDate)).first()[0]
-
-        lifetime_list = []
-
-        # Check for Observable Malfunctions
-        # This assumes Observable is a boolean column in the MalfunctionRecord model
-        if any([m.Observable for m in malfunctions]):
-
-            # Loop through each object lifetime
-            for ol in object_lifetimes:
-
-                # If the object has an end date, it's a complete failure
-                if ol.EndDate:
-                    # Calculate the lifetime in hours
-                    lifetime = (
-                        ol.EndDate - ol.StartDate).total_seconds() / 3600.0
-                    # Append the lifetime and its censoring type (0 for complete) to the list
-                    lifetime_list.append(
-                        {"lifetime": lifetime, "censoring": 0})
-
-                # If the object doesn't have an end date, it's right-censored
-                else:
-                    # Calculate the right-censored lifetime in hours
-                    lifetime = (end_observation_period -
-                                ol.StartDate).total_seconds() / 3600.0
-                    # Append the right-censored lifetime and its censoring type (1 for right-censored) to the list
-                    lifetime_list.append(
-                        {"lifetime": lifetime, "censoring": 1})
-
-            # Calculate the number of unobserved objects
-            unobserved_objects_count = num_objects - len(set(object_ids))
-            # Calculate the lifetime for unobserved objects in hours
-            unobserved_lifetime = (
-                end_observation_period - earliest_lifetime_start).total_seconds() / 3600.0
-            # Extend the list with the lifetimes of unobserved objects, which are all right-censored
-            lifetime_list.extend(
-                [{"lifetime": unobserved_lifetime, "censoring": 1}] * unobserved_objects_count)
-
-        # If the malfunctions are Non-Observable
-        else:
-
-            # Loop through each object lifetime
-            for ol in object_lifetimes:
-
-                # If the object has an end date, it's interval-censored
-                if ol.EndDate:
-                    # Calculate the start and end lifetimes for the interval in hours
-                    start_lifetime = (ol.IntervalStart -
-                                      ol.StartDate).total_seconds() / 3600.0
-                    end_lifetime = (ol.IntervalEnd -
-                                    ol.StartDate).total_seconds() / 3600.0
-                    # Append the interval-censored lifetimes and its censoring type (2 for interval-censored) to the list
-                    lifetime_list.append(
-                        {"lifetime": [start_lifetime, end_lifetime], "censoring": 2})
-
-                # If the object doesn't have an end date, it's right-censored
-                else:
-                    # Calculate the right-censored lifetime in hours
-                    lifetime = (end_observation_period -
-                                ol.StartDate).total_seconds() / 3600.0
-                    # Append the right-censored lifetime and its censoring type (1 for right-censored) to the list
-                    lifetime_list.append(
-                        {"lifetime": lifetime, "censoring": 1})
-
-            # Calculate the number of unobserved objects
-            unobserved_objects_count = num_objects - len(set(object_ids))
-            # Calculate the lifetime for unobserved objects in hours
-            unobserved_lifetime = (
-                end_observation_period - earliest_lifetime_start).total_seconds() / 3600.0
-            # Extend the list with the lifetimes of unobserved objects, which are all right-censored
-            lifetime_list.extend(
-                [{"lifetime": unobserved_lifetime, "censoring": 1}] * unobserved_objects_count)
+            func.min(data_model.ObjectLifetime.StartDate)).filter(
+            data_model.ObjectLifetime.StartDate <= end_observation_period).first()[0]
 
-        # Close the database session
+        return summaries, earliest_lifetime_start
+
+    @staticmethod
+    def observation_period_range(start: date, end: date, step_months: int = 1) -> List[date]:
+        """
+        Build a list of observation period ends from start to end (inclusive) in monthly steps.
+        Days that do not exist in a month are clamped to the last day of that month.
+        """
+        if step_months < 1:
+            raise ValueError("step_months should be at least 1")
+
+        periods = []
+        step = 0
+        current = start
+        while current <= end:
+            periods.append(current)
+            step += step_months
+            current = ComponentDataHandler._add_months(start, step)
+        return periods
+
+    @staticmethod
+    def _add_months(value: date, months: int) -> date:
+        """Add a number of months to a date, clamping the day to the last day of the resulting month."""
+        month_index = value.month - 1 + months
+        year = value.year + month_index // 12
+        month = month_index % 12 + 1
+        day = min(value.day, calendar.monthrange(year, month)[1])
+        return date(year, month, day)
+
+    def calculate_lifetime_sweep(self, failure_type_code: str, num_objects: int, end_observation_periods: List[date]) -> List[Dict]:
+        """
+        Calculate lifetimes for a series of observation period ends.
+
+        The precomputed lifetimes are loaded once, up to the last observation period end, and the
+        observation periods are processed in ascending order: lifetimes whose end falls inside the
+        observation window move from right-censored to uncensored, and the remaining right-censored
+        lifetimes are recomputed against the new end of the window. Each step has the same lifetimes
+        as calculate_lifetimes for that observation period end.
+        Returns a list of {"end_observation_period": date, "lifetimes": list} entries, ordered by date.
+        """
+        if not end_observation_periods:
+            raise ValueError("No observation period ends given")
+
+        if self._snapshot is not None:
+            return [{"end_observation_period": end_observation_period,
+                     "lifetimes": self._snapshot.calculate_lifetimes(failure_type_code, num_objects, end_observation_period)}
+                    for end_observation_period in sorted(set(end_observation_periods))]
+
+        session = SessionFactory.reader()
+        summaries, earliest_lifetime_start = self._load_lifetime_summaries(
+            session, failure_type_code, max(end_observation_periods))
         session.close()
 
-        # Return the list of lifetimes with their respective censoring types
-        return lifetime_list
+        sweep = self._lifetime_window_sweep(summaries, earliest_lifetime_start, num_objects)
+        return [{"end_observation_period": end_observation_period,
+                 "lifetimes": sweep.lifetimes(self._hours_since_epoch(end_observation_period))}
+                for end_observation_period in sorted(set(end_observation_periods))]
 
-    def get_fit_lifetime_distributions(self, lifetimes) -> dict:
-        # Fit distributions
-        fits = fit_distributions_to_data(lifetimes)
+    def lifetime_arrays(self, failure_type_code: str, num_objects: int, end_observation_period: date) -> Tuple:
+        """
+        Lifetime and censoring arrays of an observation period for the fitting functions, with
+        interval-censored lifetimes at the middle of their interval. In offline mode they are built
+        directly from the zero-copy views of the snapshot, without a list of lifetimes.
+        """
+        if self._snapshot is not None:
+            return self._snapshot.lifetime_arrays(failure_type_code, num_objects, end_observation_period)
 
-        # Convert fits to the desired dictionary format
-        results = {
+        lifetimes = self.calculate_lifetimes(
+            failure_type_code, num_objects, end_observation_period)
+        return LifetimeProcessor(lifetimes).process_interval_censoring()
+
+    def lifetime_array_sweep(self, failure_type_code: str, num_objects: int, end_observation_periods: List[date]) -> List[Dict]:
+        """
+        Lifetime and censoring arrays for a series of observation period ends, as in lifetime_arrays.
+        Returns a list of {"end_observation_period": date, "lifetime_array": array, "censoring_array": array}
+        entries, ordered by date.
+        """
+        if not end_observation_periods:
+            raise ValueError("No observation period ends given")
+
+        if self._snapshot is not None:
+            series = []
+            for end_observation_period in sorted(set(end_observation_periods)):
+                lifetime_array, censoring_array = self._snapshot.lifetime_arrays(
+                    failure_type_code, num_objects, end_observation_period)
+                series.append({"end_observation_period": end_observation_period,
+                               "lifetime_array": lifetime_array, "censoring_array": censoring_array})
+            return series
+
+        series = []
+        for step in self.calculate_lifetime_sweep(failure_type_code, num_objects, end_observation_periods):
+            lifetime_array, censoring_array = LifetimeProcessor(
+                step["lifetimes"]).process_interval_censoring()
+            series.append({"end_observation_period": step["end_observation_period"],
+                           "lifetime_array": lifetime_array, "censoring_array": censoring_array})
+        return series
+
+    @staticmethod
+    def _format_fit_parameters(fits: dict) -> dict:
+        """Convert surpyval fits to the dictionary format of the API responses."""
+        return {
             "weibull": {
                 "alpha": fits["weibull"].params[0],
                 "beta": fits["weibull"].params[1]
@@ -269,19 +574,57 @@ class ComponentDataHandler:
                 "lambda_": fits["exponential"].params[0]
             }
         }
+
+    def get_fit_lifetime_distributions(self, lifetimes) -> dict:
+        # Fit distributions
+        fits = fit_distributions_to_data(lifetimes)
+
+        # Convert fits to the desired dictionary format
+        return self._format_fit_parameters(fits)
+
+    def get_fit_lifetime_distributions_from_arrays(self, lifetime_array, censoring_array) -> dict:
+        """Fit distributions to lifetime and censoring arrays, e.g. those returned by lifetime_arrays."""
+        return self._format_fit_parameters(
+            fit_distributions_to_arrays(lifetime_array, censoring_array))
+
+    def get_fit_lifetime_distributions_sweep(self, lifetime_series: List[Dict]) -> List[dict]:
+        """
+        Fit distributions for every step of a lifetime array sweep, as returned by lifetime_array_sweep.
+        Each fit is warm-started from the parameters of the last step that could be fitted. Steps
+        that cannot be fitted, e.g. because all their lifetimes are right-censored, get null fits.
+        """
+        results = []
+        init = None
+        for step in lifetime_series:
+            result = {"end_observation_period": step["end_observation_period"],
+                      "weibull": None, "exponential": None}
+            try:
+                fits = fit_distributions_to_arrays(
+                    step["lifetime_array"], step["censoring_array"], init)
+            except ValueError as error:
+                logging.warning("No fit for observation period end %s: %s",
+                                step["end_observation_period"], error)
+            else:
+                result.update(self._format_fit_parameters(fits))
+                init = {name: list(fit.params) for name, fit in fits.items()}
+            results.append(result)
         return results
 
     def get_goodness_of_fit_statistics(self, lifetime: list, number_of_samples) -> dict:
-        # Get the distribution fits
-        fits = fit_distributions_to_data(lifetime)
-
         # Extract lifetimes and censoring arrays
         processor = LifetimeProcessor(lifetime)
         lifetime_array, censoring_array = processor.process_interval_censoring()
 
-        # Get bootstrapped p-values
+        return self.get_goodness_of_fit_statistics_from_arrays(lifetime_array, censoring_array, number_of_samples)
+
+    def get_goodness_of_fit_statistics_from_arrays(self, lifetime_array, censoring_array, number_of_samples) -> dict:
+        """Goodness of fit statistics for lifetime and censoring arrays, e.g. those returned by lifetime_arrays."""
+        # Get the distribution fits
+        fits = fit_distributions_to_arrays(lifetime_array, censoring_array)
+
+        # Get bootstrapped p-values, bootstrap_p_value looks the samples up with list.index
         weibull_p_value, exponential_p_value, number_of_samples = bootstrap_p_value(
-            lifetime_array, censoring_array, number_of_samples)
+            list(lifetime_array), list(censoring_array), number_of_samples)
         test_statistics = calculate_ks_statistic(
             lifetime_array, censoring_array)
         # Extract AIC values directly from fits
@@ -1,9 +1,13 @@
 from datetime import date
-from sqlalchemy import ForeignKey, Integer, String, Float, Date, Time, Boolean, Column
+from sqlalchemy import ForeignKey, Integer, String, Float, Date, Time, Boolean, Column, Index
 from sqlalchemy.orm import (DeclarativeBase, Mapped, class_mapper,
                             mapped_column, relationship)
 import uuid
 from sqlalchemy.ext.hybrid import HybridExtensionType
+from database.partitioning import PARTITION_TABLES
+
+# Reference date of the hour offsets in FailureTypeLifetimeSummary
+LIFETIME_EPOCH = date(1970, 1, 1)
 
 
 class Base(DeclarativeBase):
@@ -33,7 +37,15 @@ class FailureTypeCode(Base):
 
 
 class FailureTypeCodeChangeHistory(Base):
+    """
+    Monthly failure counts (FailureFrequency) and number of components with a failure of the
+    type so far (NumberOfComponents) per failure type, maintained on malfunction ingestion.
+    """
     __tablename__ = 'FailureTypeCodeChangeHistory'
+    __table_args__ = (
+        Index('ix_FailureTypeCodeChangeHistory_FailureTypeCodeID_StartDate',
+              'FailureTypeCodeID', 'StartDate'),
+    )
     ID: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=uuid.uuid4)
     FailureTypeCodeID: Mapped[str] = mapped_column(
@@ -64,6 +76,8 @@ class ObjectCode(Base):
 
 class MalfunctionRecord(Base):
     __tablename__ = 'MalfunctionRecord'
+    # Optionally range partitioned by EventDate, which then has to be part of the primary key
+    __table_args__ = {'postgresql_partition_by': 'RANGE ("EventDate")'} if PARTITION_TABLES else {}
     ID: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=uuid.uuid4)
     MaintenanceGroupID: Mapped[str] = mapped_column(
@@ -72,7 +86,8 @@ class MalfunctionRecord(Base):
     ObjectCodeID: Mapped[str] = mapped_column(
         String(36), ForeignKey('ObjectCode.ID'))
     Description: Mapped[str] = mapped_column(String)
-    EventDate: Mapped[date] = mapped_column(Date, nullable=False)
+    EventDate: Mapped[date] = mapped_column(
+        Date, nullable=False, primary_key=PARTITION_TABLES)
     LastTestDate: Mapped[date] = mapped_column(Date, nullable=True)
     EventTime: Mapped[Time] = mapped_column(Time, nullable=True)
     Observable: Mapped[bool] = mapped_column(Boolean, nullable=False)
@@ -82,11 +97,15 @@ class MalfunctionRecord(Base):
 
 class ObjectLifetime(Base):
     __tablename__ = 'ObjectLifetime'
+    # Optionally range partitioned by StartDate, which then has to be part of the primary key
+    __table_args__ = {'postgresql_partition_by': 'RANGE ("StartDate")'} if PARTITION_TABLES else {}
     ID: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=str(uuid.uuid4()))
     ObjectCodeID: Mapped[str] = mapped_column(
         String(36), ForeignKey('ObjectCode.ID'))
-    StartDate: Mapped[date] = mapped_column(Date, nullable=False)
+    # Indexed for the earliest lifetime start of the observation window
+    StartDate: Mapped[date] = mapped_column(
+        Date, nullable=False, primary_key=PARTITION_TABLES, index=True)
     StartTime: Mapped[Time] = mapped_column(Time, nullable=True)
     EndDate: Mapped[date] = mapped_column(Date, nullable=True)
     EndTime: Mapped[Time] = mapped_column(Time, nullable=True)
@@ -98,3 +117,30 @@ class ObjectLifetime(Base):
         Date, nullable=True)  # Interval End Date
     IntervalEndTime: Mapped[Time] = mapped_column(
         Time, nullable=True)  # Interval End Time
+
+
+class FailureTypeLifetimeSummary(Base):
+    """
+    Lifetimes per failure type, derived from MalfunctionRecord and ObjectLifetime.
+    Contains a row for each lifetime of each object with a malfunction of the failure type.
+    Refreshed on malfunction ingestion for the failure types of the touched objects.
+    """
+    __tablename__ = 'FailureTypeLifetimeSummary'
+    __table_args__ = (
+        Index('ix_FailureTypeLifetimeSummary_FailureTypeCodeID_StartHours',
+              'FailureTypeCodeID', 'StartHours'),
+    )
+    FailureTypeCodeID: Mapped[str] = mapped_column(
+        String(36), ForeignKey('FailureTypeCode.ID'), primary_key=True)
+    ObjectLifetimeID: Mapped[str] = mapped_column(
+        String(36), primary_key=True)
+    ObjectCodeID: Mapped[str] = mapped_column(
+        String(36), ForeignKey('ObjectCode.ID'))
+    # Start of the lifetime in hours since LIFETIME_EPOCH
+    StartHours: Mapped[float] = mapped_column(Float, nullable=False)
+    # Lifetime and interval bounds in hours since the start, empty while the lifetime has not ended
+    LifetimeHours: Mapped[float] = mapped_column(Float, nullable=True)
+    IntervalStartHours: Mapped[float] = mapped_column(Float, nullable=True)
+    IntervalEndHours: Mapped[float] = mapped_column(Float, nullable=True)
+    # Whether the malfunctions of the failure type are observable
+    Observable: Mapped[bool] = mapped_column(Boolean, nullable=False)
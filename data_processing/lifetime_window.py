@@ -0,0 +1,122 @@
+# data_processing/lifetime_window.py
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+def window_masks(start_hours: Sequence[float], lifetime_hours: Sequence[Optional[float]],
+                 end_hours: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the lifetimes of an observation window ending at end_hours.
+
+    Returns a mask of the lifetimes that started within the window, and a mask of the lifetimes
+    that also ended within it. Lifetimes that have not ended have a lifetime of None or NaN, and
+    lifetimes that end after the window are right-censored at the end of the window.
+    """
+    start_hours = np.asarray(start_hours, dtype=float)
+    lifetime_hours = np.asarray(lifetime_hours, dtype=float)
+    in_window = start_hours <= end_hours
+    ended = in_window & (start_hours + lifetime_hours <= end_hours)
+    return in_window, ended
+
+
+def unobserved_lifetime(earliest_start_hours: Optional[float], end_hours: float) -> Optional[float]:
+    """
+    Right-censored lifetime of the objects without a lifetime in an observation window ending at
+    end_hours, measured from the earliest lifetime start. Returns None when no lifetime started
+    within the window, the unobserved objects have then not been observed at all.
+    """
+    if earliest_start_hours is None or np.isnan(earliest_start_hours) or earliest_start_hours > end_hours:
+        return None
+    return float(end_hours - earliest_start_hours)
+
+
+class LifetimeWindowSweep:
+    """
+    Builds the lifetime lists of observation windows with increasing ends over the same lifetimes.
+
+    Lifetimes that ended within a window are complete failures (censoring 0) for observable
+    malfunctions and interval-censored (censoring 2) otherwise, the other lifetimes that started
+    within the window are right-censored (censoring 1). Objects without a lifetime in the window
+    are unobserved and right-censored from earliest_start_hours, or left out when no lifetime
+    started within the window (see unobserved_lifetime).
+    All hours are measured from the same reference date, lifetimes are never negative.
+
+    The state is kept between windows: a lifetime moves from right-censored to ended once, in the
+    order of the end of the lifetimes, and its entry is reused by every later window. The number
+    of observed objects is read from the sorted first lifetime starts of the objects. Only the
+    right-censored lifetimes, whose value depends on the end of the window, are recomputed.
+    Every window gets the same lifetimes as a sweep that starts at that window.
+    """
+
+    def __init__(self, start_hours: Sequence[float], lifetime_hours: Sequence[Optional[float]],
+                 interval_start_hours: Sequence[Optional[float]], interval_end_hours: Sequence[Optional[float]],
+                 object_ids: Sequence, observable: bool, num_objects: int, earliest_start_hours: Optional[float]):
+        self.start_hours = np.asarray(start_hours, dtype=float)
+        self.lifetime_hours = np.asarray(lifetime_hours, dtype=float)
+        self.interval_start_hours = np.asarray(interval_start_hours, dtype=float)
+        self.interval_end_hours = np.asarray(interval_end_hours, dtype=float)
+        self.observable = observable
+        self.num_objects = num_objects
+        self.earliest_start_hours = earliest_start_hours
+
+        # Lifetimes in the order of their end, open lifetimes (NaN) sort last and never end
+        lifetime_end_hours = self.start_hours + self.lifetime_hours
+        self._ending_order = np.argsort(lifetime_end_hours, kind="stable")
+        self._sorted_end_hours = lifetime_end_hours[self._ending_order]
+
+        # First lifetime start per object, an object is observed once its first lifetime started
+        _, object_codes = np.unique(np.asarray(object_ids), return_inverse=True)
+        first_start_hours = np.full(object_codes.max() + 1 if len(object_codes) else 0, np.inf)
+        np.minimum.at(first_start_hours, object_codes, self.start_hours)
+        self._sorted_first_start_hours = np.sort(first_start_hours)
+
+        self._ended = np.zeros(len(self.start_hours), dtype=bool)
+        self._next_ending = 0
+        self._ended_lifetimes = []
+        self._end_hours = -np.inf
+
+    def lifetimes(self, end_hours: float) -> List[Dict]:
+        """Returns the lifetime list of the observation window ending at end_hours."""
+        if end_hours < self._end_hours:
+            raise ValueError("Observation window ends should be increasing")
+        self._end_hours = end_hours
+
+        # Move the lifetimes that ended within the window from right-censored to ended
+        next_ending = int(np.searchsorted(self._sorted_end_hours, end_hours, side="right"))
+        newly_ended = self._ending_order[self._next_ending:next_ending]
+        self._ended[newly_ended] = True
+        self._next_ending = next_ending
+        if self.observable:
+            self._ended_lifetimes.extend(
+                {"lifetime": lifetime, "censoring": 0} for lifetime in self.lifetime_hours[newly_ended].tolist())
+        else:
+            self._ended_lifetimes.extend(
+                {"lifetime": [interval_start, interval_end], "censoring": 2}
+                for interval_start, interval_end in zip(self.interval_start_hours[newly_ended].tolist(),
+                                                        self.interval_end_hours[newly_ended].tolist()))
+
+        # The other lifetimes that started within the window are right-censored at its end
+        censored = (self.start_hours <= end_hours) & ~self._ended
+        lifetime_list = list(self._ended_lifetimes)
+        lifetime_list.extend(
+            {"lifetime": lifetime, "censoring": 1} for lifetime in (end_hours - self.start_hours[censored]).tolist())
+
+        # Objects without a lifetime in the window are unobserved, and right-censored
+        observed_objects_count = int(np.searchsorted(self._sorted_first_start_hours, end_hours, side="right"))
+        unobserved_objects_count = self.num_objects - observed_objects_count
+        lifetime = unobserved_lifetime(self.earliest_start_hours, end_hours)
+        if unobserved_objects_count > 0 and lifetime is not None:
+            lifetime_list.extend(
+                [{"lifetime": lifetime, "censoring": 1}] * unobserved_objects_count)
+
+        return lifetime_list
+
+
+def window_lifetimes(start_hours: Sequence[float], lifetime_hours: Sequence[Optional[float]],
+                     interval_start_hours: Sequence[Optional[float]], interval_end_hours: Sequence[Optional[float]],
+                     object_ids: Sequence, observable: bool, num_objects: int,
+                     earliest_start_hours: Optional[float], end_hours: float) -> List[Dict]:
+    """Build the lifetime list of a single observation window ending at end_hours, see LifetimeWindowSweep."""
+    return LifetimeWindowSweep(
+        start_hours, lifetime_hours, interval_start_hours, interval_end_hours,
+        object_ids, observable, num_objects, earliest_start_hours).lifetimes(end_hours)
@@ -0,0 +1,266 @@
+# data_processing/snapshot.py
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, List, Tuple, Union
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Boolean, Date, Float, Integer, String, Time
+from sqlalchemy.orm import class_mapper
+import data_model as data_model
+from data_processing.lifetime_window import unobserved_lifetime, window_lifetimes, window_masks
+
+# Reference date of the hour offsets in the lifetime arrays
+EPOCH = data_model.LIFETIME_EPOCH
+METADATA_FILE = "snapshot.json"
+LIFETIMES_DIRECTORY = "lifetimes"
+# Number of rows fetched from the database and written to Parquet at a time
+EXPORT_BATCH_SIZE = 100_000
+
+# Tables exported as single Parquet files and as Parquet datasets partitioned by year
+SNAPSHOT_TABLES = [data_model.ObjectCode, data_model.FailureTypeCode]
+PARTITIONED_SNAPSHOT_TABLES = {
+    data_model.MalfunctionRecord: "EventDate",
+    data_model.ObjectLifetime: "StartDate",
+}
+
+# Arrow types of the column types of the data model
+ARROW_TYPES = [
+    (Boolean, pa.bool_()),
+    (Integer, pa.int64()),
+    (Float, pa.float64()),
+    (Date, pa.date32()),
+    (Time, pa.time64("us")),
+    (String, pa.string()),
+]
+
+LIFETIME_SCHEMA = pa.schema([
+    ("start_hours", pa.float64()),
+    ("lifetime_hours", pa.float64()),
+    ("interval_start_hours", pa.float64()),
+    ("interval_end_hours", pa.float64()),
+    # Index of the object of the lifetime among the objects with a malfunction of the failure type
+    ("object_index", pa.int32()),
+])
+
+
+def _hours_since_epoch(value: date) -> float:
+    return (value - EPOCH).total_seconds() / 3600.0
+
+
+def _hours_between(start: date, end: date) -> float:
+    return np.nan if start is None or end is None else (end - start).total_seconds() / 3600.0
+
+
+def _table_schema(model) -> pa.Schema:
+    """
+    Arrow schema of the columns of a table. Every Parquet batch is written with it, so columns
+    that are NULL in a whole batch keep their type.
+    """
+    fields = []
+    for column in class_mapper(model).columns:
+        arrow_type = next(arrow_type for column_type, arrow_type in ARROW_TYPES
+                          if isinstance(column.type, column_type))
+        fields.append(pa.field(column.key, arrow_type))
+    return pa.schema(fields)
+
+
+def _export_partitioned(session, model, directory: str):
+    """
+    Stream the rows of a table to a Parquet dataset partitioned by year, in batches of EXPORT_BATCH_SIZE.
+    Yields every exported row as a dictionary.
+    """
+    path = os.path.join(directory, model.__tablename__)
+    date_column = PARTITIONED_SNAPSHOT_TABLES[model]
+    schema = _table_schema(model).append(pa.field("Year", pa.int32()))
+    batch = []
+    for row in session.query(model).yield_per(EXPORT_BATCH_SIZE):
+        record = row.to_dict()
+        record["Year"] = record[date_column].year
+        batch.append(record)
+        yield record
+        if len(batch) == EXPORT_BATCH_SIZE:
+            pq.write_to_dataset(pa.Table.from_pylist(batch, schema), path, partition_cols=["Year"])
+            batch = []
+    if batch:
+        pq.write_to_dataset(pa.Table.from_pylist(batch, schema), path, partition_cols=["Year"])
+
+
+def export_snapshot(session, directory: str):
+    """
+    Export the lifetime data to an empty snapshot directory for offline analysis.
+
+    ObjectCode and FailureTypeCode are written as Parquet files, MalfunctionRecord and ObjectLifetime
+    as Parquet datasets partitioned by year. For each failure type the lifetimes used by
+    calculate_lifetimes are precomputed and written as an uncompressed Arrow IPC file, which
+    SnapshotReader memory-maps. Missing values in these files are stored as NaN.
+    MalfunctionRecord and ObjectLifetime are streamed and read only once. On PostgreSQL all tables
+    are read in one REPEATABLE READ transaction, so rows ingested during the export are left out
+    consistently.
+
+    :param session: Database session to read from, without a transaction in progress.
+    :param directory: Directory to write the snapshot to, which should not exist or be empty.
+    """
+    if os.path.isdir(directory) and os.listdir(directory):
+        raise ValueError(f"Snapshot directory {directory} is not empty")
+    os.makedirs(os.path.join(directory, LIFETIMES_DIRECTORY), exist_ok=True)
+
+    if session.get_bind().dialect.name == "postgresql":
+        session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+    exported_records = {}
+    for model in SNAPSHOT_TABLES:
+        exported_records[model] = [row.to_dict() for row in session.query(model).all()]
+        pq.write_table(pa.Table.from_pylist(exported_records[model], _table_schema(model)),
+                       os.path.join(directory, f"{model.__tablename__}.parquet"))
+
+    # Objects and observability per failure type, in one pass over the malfunctions
+    failure_type_objects = {}
+    observable_failure_types = set()
+    for record in _export_partitioned(session, data_model.MalfunctionRecord, directory):
+        failure_type_id = record["FailureTypeCodeID"]
+        if failure_type_id is None:
+            continue
+        failure_type_objects.setdefault(failure_type_id, set()).add(record["ObjectCodeID"])
+        if record["Observable"]:
+            observable_failure_types.add(failure_type_id)
+
+    # Failure types and object index per object, the object index is the position among the objects of the failure type
+    object_failure_types = {}
+    for failure_type_id, object_ids in failure_type_objects.items():
+        for object_index, object_id in enumerate(sorted(object_ids)):
+            object_failure_types.setdefault(object_id, []).append((failure_type_id, object_index))
+
+    # Lifetime columns per failure type, in one pass over the lifetimes
+    failure_type_columns = {record["ID"]: {name: [] for name in LIFETIME_SCHEMA.names}
+                            for record in exported_records[data_model.FailureTypeCode]}
+    earliest_lifetime_start = None
+    for record in _export_partitioned(session, data_model.ObjectLifetime, directory):
+        start_date = record["StartDate"]
+        if earliest_lifetime_start is None or start_date < earliest_lifetime_start:
+            earliest_lifetime_start = start_date
+
+        for failure_type_id, object_index in object_failure_types.get(record["ObjectCodeID"], []):
+            columns = failure_type_columns[failure_type_id]
+            columns["start_hours"].append(_hours_since_epoch(start_date))
+            columns["lifetime_hours"].append(_hours_between(start_date, record["EndDate"]))
+            columns["interval_start_hours"].append(_hours_between(start_date, record["IntervalStart"]))
+            columns["interval_end_hours"].append(_hours_between(start_date, record["IntervalEnd"]))
+            columns["object_index"].append(object_index)
+
+    for failure_type_id, columns in failure_type_columns.items():
+        batch = pa.record_batch(
+            [pa.array(columns[field.name], field.type) for field in LIFETIME_SCHEMA],
+            schema=LIFETIME_SCHEMA.with_metadata({
+                "observable": json.dumps(failure_type_id in observable_failure_types),
+            }))
+
+        path = os.path.join(directory, LIFETIMES_DIRECTORY, f"{failure_type_id}.arrow")
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+
+    with open(os.path.join(directory, METADATA_FILE), "w") as metadata_file:
+        json.dump({
+            "created": datetime.now().isoformat(),
+            "earliest_lifetime_start": earliest_lifetime_start.isoformat() if earliest_lifetime_start else None,
+        }, metadata_file)
+
+
+class SnapshotReader:
+    """
+    Reads lifetimes from a snapshot directory created by export_snapshot, without a database connection.
+
+    The per-failure-type lifetime files are memory-mapped and their columns are returned as
+    zero-copy NumPy views.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, METADATA_FILE)) as metadata_file:
+            metadata = json.load(metadata_file)
+        self.earliest_lifetime_start = date.fromisoformat(
+            metadata["earliest_lifetime_start"]) if metadata["earliest_lifetime_start"] else None
+
+        failure_types = pq.read_table(os.path.join(
+            directory, "FailureTypeCode.parquet"), columns=["ID", "Code"]).to_pylist()
+        self.failure_type_ids = {
+            row["Code"].lower(): row["ID"] for row in failure_types}
+        self._batches = {}
+
+    def _lifetime_batch(self, failure_type_code: str) -> pa.RecordBatch:
+        """Returns the memory-mapped lifetime record batch of a failure type."""
+        failure_type_id = self.failure_type_ids.get(failure_type_code.lower())
+        if failure_type_id is None:
+            raise ValueError("FailureTypeCode not found")
+
+        if failure_type_id not in self._batches:
+            source = pa.memory_map(os.path.join(
+                self.directory, LIFETIMES_DIRECTORY, f"{failure_type_id}.arrow"))
+            self._batches[failure_type_id] = pa.ipc.open_file(source).get_batch(0)
+        return self._batches[failure_type_id]
+
+    def lifetime_columns(self, failure_type_code: str) -> Dict[str, Union[np.ndarray, bool]]:
+        """
+        Returns the precomputed lifetime columns of a failure type as zero-copy NumPy views,
+        together with the observable flag.
+        """
+        batch = self._lifetime_batch(failure_type_code)
+        columns = {name: batch.column(name).to_numpy(zero_copy_only=True)
+                   for name in LIFETIME_SCHEMA.names}
+        columns["observable"] = json.loads(batch.schema.metadata[b"observable"])
+        return columns
+
+    def _earliest_start_hours(self):
+        return _hours_since_epoch(self.earliest_lifetime_start) if self.earliest_lifetime_start else None
+
+    def lifetime_arrays(self, failure_type_code: str, num_objects: int, end_observation_period: date,
+                        interval_lifetime_indicator: str = 'mid') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the lifetime and censoring arrays for the fitting functions, with interval-censored
+        lifetimes replaced as in LifetimeProcessor.process_interval_censoring.
+        The lifetimes are selected as in calculate_lifetimes.
+        """
+        assert interval_lifetime_indicator in ['start', 'mid', 'end'], \
+            "interval_lifetime_indicator should be one of ['start', 'mid', 'end']"
+
+        columns = self.lifetime_columns(failure_type_code)
+        end_hours = _hours_since_epoch(end_observation_period)
+        in_window, ended = window_masks(
+            columns["start_hours"], columns["lifetime_hours"], end_hours)
+        censored = in_window & ~ended
+
+        if columns["observable"]:
+            ended_lifetimes = columns["lifetime_hours"][ended]
+        elif interval_lifetime_indicator == 'start':
+            ended_lifetimes = columns["interval_start_hours"][ended]
+        elif interval_lifetime_indicator == 'mid':
+            ended_lifetimes = (columns["interval_start_hours"][ended] +
+                               columns["interval_end_hours"][ended]) / 2
+        else:
+            ended_lifetimes = columns["interval_end_hours"][ended]
+
+        unobserved_objects_count = max(
+            num_objects - len(np.unique(columns["object_index"][in_window])), 0)
+        unobserved = unobserved_lifetime(self._earliest_start_hours(), end_hours)
+        if unobserved is None:
+            unobserved_objects_count = 0
+
+        lifetime_array = np.concatenate([
+            ended_lifetimes,
+            end_hours - columns["start_hours"][censored],
+            np.full(unobserved_objects_count, unobserved)])
+        censoring_array = np.concatenate([
+            np.zeros(len(ended_lifetimes), dtype=int),
+            np.ones(len(lifetime_array) - len(ended_lifetimes), dtype=int)])
+        return lifetime_array, censoring_array
+
+    def calculate_lifetimes(self, failure_type_code: str, num_objects: int, end_observation_period: date) -> List[Dict]:
+        """Offline counterpart of ComponentDataHandler.calculate_lifetimes."""
+        columns = self.lifetime_columns(failure_type_code)
+        return window_lifetimes(
+            columns["start_hours"], columns["lifetime_hours"],
+            columns["interval_start_hours"], columns["interval_end_hours"],
+            columns["object_index"], columns["observable"], num_objects,
+            self._earliest_start_hours(), _hours_since_epoch(end_observation_period))
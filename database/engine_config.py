@@ -16,3 +16,19 @@ DATABASE_NAME = os.getenv("DATABASE_NAME")
 # Create Database connection
 DATABASE_URL = f"postgresql://{USER}:{PASSWORD}@{HOST}:{PORT}/{DATABASE_NAME}"
 engine = create_engine(DATABASE_URL, echo=True)
+
+# Optional read replicas as comma separated host:port pairs, using the same credentials and database name
+REPLICA_HOSTS = [host.strip()
+                 for host in os.getenv("REPLICA_HOSTS", "").split(",") if host.strip()]
+replica_engines = [
+    create_engine(
+        f"postgresql://{USER}:{PASSWORD}@{host}/{DATABASE_NAME}", echo=True, pool_pre_ping=True)
+    for host in REPLICA_HOSTS
+]
+
+# Seconds an unreachable replica is skipped before it is checked again
+REPLICA_RETRY_INTERVAL = float(os.getenv("REPLICA_RETRY_INTERVAL", "30"))
+# Seconds a replica that passed its health check is used without checking it again
+REPLICA_HEALTHY_INTERVAL = float(os.getenv("REPLICA_HEALTHY_INTERVAL", "5"))
+# Route reads to the primary until the replicas have replayed the latest write
+READ_YOUR_WRITES = os.getenv("READ_YOUR_WRITES", "true").lower() in ("1", "true", "yes")
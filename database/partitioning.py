@@ -0,0 +1,185 @@
+# database/partitioning.py
+from datetime import date
+from typing import Iterable
+from sqlalchemy import text
+from dotenv import load_dotenv
+import os
+
+# Load environment variables
+load_dotenv()
+
+# Optional PostgreSQL range partitioning of the large history tables
+PARTITION_TABLES = os.getenv("PARTITION_TABLES", "false").lower() in ("1", "true", "yes")
+# First year with a partition when the database is created (observations started in 2010)
+PARTITION_FIRST_YEAR = int(os.getenv("PARTITION_FIRST_YEAR", "2010"))
+
+# Partitioned tables and the date column they are partitioned by
+PARTITION_KEYS = {
+    "MalfunctionRecord": "EventDate",
+    "ObjectLifetime": "StartDate",
+}
+
+# Indexes created on the partitioned parent tables (and therefore on every partition)
+PARTITION_INDEXES = {
+    "MalfunctionRecord": ["FailureTypeCodeID", "ObjectCodeID", "MalfunctionNumber"],
+    "ObjectLifetime": ["ObjectCodeID", "StartDate"],
+}
+
+
+def partition_name(table_name: str, year: int) -> str:
+    """Returns the name of the yearly partition of a table."""
+    return f"{table_name}_{year}"
+
+
+def default_partition_name(table_name: str) -> str:
+    """Returns the name of the default partition of a table."""
+    return f"{table_name}_default"
+
+
+def create_year_partitions(connection, table_name: str, years: Iterable[int]):
+    """
+    Create the yearly range partitions of a partitioned table if they don't exist yet, together
+    with the default partition for rows of years without a partition, e.g. ObjectLifetime rows
+    that start before the first partition.
+
+    Rows of a new partition's year that are in the default partition are moved to the new
+    partition, since PostgreSQL cannot create a partition for rows in the default partition.
+
+    :param connection: SQLAlchemy connection or session.
+    :param table_name: Name of a table in PARTITION_KEYS.
+    :param years: Years for which a partition should exist.
+    """
+    key = PARTITION_KEYS[table_name]
+    default_partition = default_partition_name(table_name)
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{default_partition}" PARTITION OF "{table_name}" DEFAULT'))
+
+    for year in sorted(set(years)):
+        name = partition_name(table_name, year)
+        bounds = {"start": date(year, 1, 1), "end": date(year + 1, 1, 1)}
+        if connection.execute(text("SELECT to_regclass(:name)"), {"name": f'"{name}"'}).scalar() is not None:
+            continue
+
+        in_default = connection.execute(text(
+            f'SELECT EXISTS (SELECT 1 FROM "{default_partition}" WHERE "{key}" >= :start AND "{key}" < :end)'),
+            bounds).scalar()
+        if not in_default:
+            connection.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table_name}" '
+                f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"))
+            continue
+
+        connection.execute(text(
+            f'CREATE TABLE "{name}" (LIKE "{table_name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+        connection.execute(text(
+            f'WITH moved AS (DELETE FROM "{default_partition}" WHERE "{key}" >= :start AND "{key}" < :end RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'), bounds)
+        connection.execute(text(
+            f'ALTER TABLE "{table_name}" ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"))
+
+
+def ensure_partitions(connection, dates: Iterable[date]):
+    """
+    Make sure all partitioned tables have a partition for each of the given dates.
+    Called on ingestion, before records with these dates are written. Rows with other dates,
+    such as lifetimes derived by update_object_lifetimes(), go to the default partition.
+    Does nothing when partitioning is disabled.
+    """
+    if not PARTITION_TABLES:
+        return
+
+    years = {d.year for d in dates if d is not None}
+    for table_name in PARTITION_KEYS:
+        create_year_partitions(connection, table_name, years)
+
+
+def create_partition_indexes(connection, table_name: str):
+    """
+    Create the indexes in PARTITION_INDEXES on a table, on a partitioned parent table these are
+    created on every partition as well.
+    """
+    for column in PARTITION_INDEXES[table_name]:
+        connection.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{column}" ON "{table_name}" ("{column}")'))
+
+
+def _rename_table(connection, table_name: str, new_table_name: str):
+    """
+    Rename a table together with its primary key constraint and its indexes, so the index names
+    are free for the table that replaces it.
+    """
+    connection.execute(
+        text(f'ALTER TABLE "{table_name}" RENAME TO "{new_table_name}"'))
+    connection.execute(text(
+        f'ALTER TABLE "{new_table_name}" RENAME CONSTRAINT "{table_name}_pkey" TO "{new_table_name}_pkey"'))
+
+    index_names = connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() "
+        "AND tablename = :table_name AND indexname <> :primary_key"),
+        {"table_name": new_table_name, "primary_key": f"{new_table_name}_pkey"}).scalars().all()
+    for index_name in index_names:
+        new_index_name = index_name.replace(table_name, new_table_name, 1) \
+            if table_name in index_name else f"{new_table_name}_{index_name}"
+        connection.execute(text(
+            f'ALTER INDEX "{index_name}" RENAME TO "{new_index_name}"'))
+
+
+def _copy_foreign_keys(connection, source_table_name: str, target_table_name: str):
+    """Recreate the foreign key constraints of one table on another table with the same columns."""
+    foreign_keys = connection.execute(text(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = CAST(:table_name AS regclass) AND contype = 'f'"),
+        {"table_name": f'"{source_table_name}"'}).all()
+    for constraint_name, definition in foreign_keys:
+        connection.execute(text(
+            f'ALTER TABLE "{target_table_name}" ADD CONSTRAINT "{constraint_name}" {definition}'))
+
+
+def upgrade_to_partitioned(connection, first_year: int, last_year: int):
+    """
+    Convert the existing MalfunctionRecord and ObjectLifetime tables into range partitioned tables.
+
+    Intended to be called from an Alembic revision with op.get_bind(). The existing table is
+    renamed, a partitioned table with the same columns is created, partitions are created for
+    the years of the existing data and for first_year through last_year, and the data is copied.
+
+    :param connection: SQLAlchemy connection.
+    :param first_year: First year that should have a partition.
+    :param last_year: Last year that should have a partition.
+    """
+    for table_name, key in PARTITION_KEYS.items():
+        old_table_name = f"{table_name}_unpartitioned"
+        _rename_table(connection, table_name, old_table_name)
+        connection.execute(text(
+            f'CREATE TABLE "{table_name}" (LIKE "{old_table_name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS, '
+            f'PRIMARY KEY ("ID", "{key}")) PARTITION BY RANGE ("{key}")'))
+        _copy_foreign_keys(connection, old_table_name, table_name)
+
+        years = set(range(first_year, last_year + 1))
+        years.update(int(row[0]) for row in connection.execute(text(
+            f'SELECT DISTINCT EXTRACT(YEAR FROM "{key}") FROM "{old_table_name}"')))
+        create_year_partitions(connection, table_name, years)
+        create_partition_indexes(connection, table_name)
+
+        connection.execute(
+            text(f'INSERT INTO "{table_name}" SELECT * FROM "{old_table_name}"'))
+        connection.execute(text(f'DROP TABLE "{old_table_name}"'))
+
+
+def downgrade_from_partitioned(connection):
+    """
+    Convert the partitioned MalfunctionRecord and ObjectLifetime tables back into regular tables,
+    with the indexes in PARTITION_INDEXES. Intended to be called from an Alembic revision with op.get_bind().
+    """
+    for table_name in PARTITION_KEYS:
+        old_table_name = f"{table_name}_partitioned"
+        _rename_table(connection, table_name, old_table_name)
+        connection.execute(text(
+            f'CREATE TABLE "{table_name}" (LIKE "{old_table_name}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS, '
+            f'PRIMARY KEY ("ID"))'))
+        _copy_foreign_keys(connection, old_table_name, table_name)
+        create_partition_indexes(connection, table_name)
+        connection.execute(
+            text(f'INSERT INTO "{table_name}" SELECT * FROM "{old_table_name}"'))
+        connection.execute(text(f'DROP TABLE "{old_table_name}" CASCADE'))
@@ -1,6 +1,130 @@
 # database/session_factory.py
-from sqlalchemy.orm import sessionmaker
+import logging
+import threading
+import time
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 # Adjust the import based on your folder structure
-from .engine_config import engine
+from .engine_config import engine, replica_engines, REPLICA_RETRY_INTERVAL, REPLICA_HEALTHY_INTERVAL, READ_YOUR_WRITES
 
-SessionFactory = sessionmaker(bind=engine)
+
+def _parse_lsn(lsn: str) -> int:
+    """Converts a PostgreSQL WAL location (e.g. '16/B374D848') to an integer."""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+
+class RoutingSessionFactory:
+    """
+    Session factory that routes writes to the primary database and reads to the replicas.
+
+    Calling the factory returns a session on the primary, so it can be used like a sessionmaker
+    for writes and the upsert paths. Analysis reads use reader(), which picks the replicas in
+    round-robin order and skips replicas that fail a health check for retry_interval seconds.
+    A passed health check is trusted for healthy_interval seconds, so not every read checks the
+    replica first. Without healthy replicas, reads fall back to the primary.
+
+    With read_your_writes enabled, mark_written() records the WAL location of the primary after
+    an upsert, and reader() only uses replicas that have replayed up to that location.
+    """
+
+    def __init__(self, primary_engine: Engine, replica_engines: List[Engine],
+                 retry_interval: float = 30.0, read_your_writes: bool = True,
+                 healthy_interval: float = 5.0):
+        self.primary = sessionmaker(bind=primary_engine)
+        self.primary_engine = primary_engine
+        self.replica_engines = replica_engines
+        self.replicas = [sessionmaker(bind=replica_engine)
+                         for replica_engine in replica_engines]
+        self.retry_interval = retry_interval
+        self.healthy_interval = healthy_interval
+        self.read_your_writes = read_your_writes
+
+        self._lock = threading.Lock()
+        self._next_replica = 0
+        self._unhealthy_until = [0.0] * len(replica_engines)
+        self._healthy_until = [0.0] * len(replica_engines)
+        # Latest written WAL location of the primary and the latest replayed location per replica
+        self._written_lsn = 0
+        self._replayed_lsn = [0] * len(replica_engines)
+
+    def __call__(self) -> Session:
+        """Returns a session on the primary database."""
+        return self.primary()
+
+    def reader(self) -> Session:
+        """Returns a session on the next healthy replica, or on the primary if there is none."""
+        with self._lock:
+            start = self._next_replica
+            self._next_replica = (self._next_replica + 1) % max(len(self.replicas), 1)
+
+        for offset in range(len(self.replicas)):
+            index = (start + offset) % len(self.replicas)
+            if self._is_usable(index):
+                return self.replicas[index]()
+
+        return self.primary()
+
+    def mark_written(self, session: Optional[Session] = None):
+        """
+        Record the current WAL location of the primary after a committed write.
+        Does nothing when read-your-writes is disabled or there are no replicas.
+        """
+        if not (self.read_your_writes and self.replicas):
+            return
+
+        query = text("SELECT pg_current_wal_lsn()::text")
+        if session is not None:
+            lsn = session.execute(query).scalar()
+        else:
+            with self.primary_engine.connect() as connection:
+                lsn = connection.execute(query).scalar()
+
+        with self._lock:
+            self._written_lsn = max(self._written_lsn, _parse_lsn(lsn))
+
+    def _is_usable(self, index: int) -> bool:
+        """
+        Health check of a replica, which also checks whether it has replayed the latest write.
+        Once a replica is known to have replayed the latest write only its liveness is checked,
+        and a passed check is cached for healthy_interval seconds.
+        """
+        now = time.monotonic()
+        if now < self._unhealthy_until[index]:
+            return False
+
+        written_lsn = self._written_lsn if self.read_your_writes else 0
+        check_lag = self._replayed_lsn[index] < written_lsn
+        if not check_lag and now < self._healthy_until[index]:
+            return True
+
+        try:
+            with self.replica_engines[index].connect() as connection:
+                if check_lag:
+                    # Replay location is NULL when the server is not a standby
+                    replayed_lsn = connection.execute(
+                        text("SELECT pg_last_wal_replay_lsn()::text")).scalar()
+                else:
+                    connection.execute(text("SELECT 1"))
+        except Exception:
+            logging.warning(
+                "Replica %s failed the health check, using it again after %s seconds",
+                self.replica_engines[index].url.host, self.retry_interval)
+            with self._lock:
+                self._unhealthy_until[index] = time.monotonic() + self.retry_interval
+            return False
+
+        with self._lock:
+            self._healthy_until[index] = time.monotonic() + self.healthy_interval
+        if not check_lag or replayed_lsn is None:
+            return True
+        with self._lock:
+            self._replayed_lsn[index] = max(
+                self._replayed_lsn[index], _parse_lsn(replayed_lsn))
+            return self._replayed_lsn[index] >= written_lsn
+
+
+SessionFactory = RoutingSessionFactory(
+    engine, replica_engines, REPLICA_RETRY_INTERVAL, READ_YOUR_WRITES, REPLICA_HEALTHY_INTERVAL)
@@ -1,11 +1,14 @@
-from fastapi import FastAPI
-from typing import List
+from fastapi import FastAPI, HTTPException, Query
+from typing import List, Optional
 from datetime import date
 from data_handler import ComponentDataHandler
-from pydantic_model import ObjectCode, FailureTypeCode, MaintenanceGroup, MalfunctionRecord, LifetimesResponse, GoodnessOfFitResponse, DistributionModelResponse
+from pydantic_model import ObjectCode, FailureTypeCode, MaintenanceGroup, MalfunctionRecord, LifetimesResponse, GoodnessOfFitResponse, DistributionModelResponse, DistributionModelSweepResponse, RollingFailureRatesResponse
+import os
 app = FastAPI()
 
-DATA_HANDLER = ComponentDataHandler()
+# Serve the analysis endpoints from a snapshot instead of the database when SNAPSHOT_DIRECTORY is set
+DATA_HANDLER = ComponentDataHandler(
+    snapshot_directory=os.getenv("SNAPSHOT_DIRECTORY"))
 
 
 @app.post("/object/upsert/")
@@ -43,13 +46,48 @@ async def calculate_lifetimes(failure_type_code: str, num_objects: int, end_obse
 
 @app.get("/distribution_model/fit_parameters/", response_model=DistributionModelResponse)
 def get_fitted_distributions(failure_type_code: str, num_objects: int, end_observation_period: date = '2016-06-30'):
-    lifetimes = DATA_HANDLER.calculate_lifetimes(
+    lifetime_array, censoring_array = DATA_HANDLER.lifetime_arrays(
         failure_type_code, num_objects, end_observation_period)
-    return DATA_HANDLER.get_fit_lifetime_distributions(lifetimes)
+    if len(lifetime_array) == 0:
+        raise HTTPException(
+            status_code=400, detail="No lifetimes started before end_observation_period")
+    return DATA_HANDLER.get_fit_lifetime_distributions_from_arrays(lifetime_array, censoring_array)
+
+
+@app.get("/distribution_model/fit_parameters/sweep/", response_model=DistributionModelSweepResponse)
+def get_fitted_distributions_sweep(failure_type_code: str, num_objects: int, end_observation_periods: Optional[List[date]] = Query(None), observation_start: Optional[date] = None, observation_end: Optional[date] = None, step_months: int = 1):
+    if not end_observation_periods:
+        if observation_start is None or observation_end is None:
+            raise HTTPException(
+                status_code=400, detail="Provide end_observation_periods or both observation_start and observation_end")
+        if step_months < 1:
+            raise HTTPException(
+                status_code=400, detail="step_months should be at least 1")
+        end_observation_periods = DATA_HANDLER.observation_period_range(
+            observation_start, observation_end, step_months)
+        if not end_observation_periods:
+            raise HTTPException(
+                status_code=400, detail="observation_start should not be after observation_end")
+    lifetime_series = DATA_HANDLER.lifetime_array_sweep(
+        failure_type_code, num_objects, end_observation_periods)
+    return {"fits": DATA_HANDLER.get_fit_lifetime_distributions_sweep(lifetime_series)}
 
 
 @app.get("/distribution_model/goodness-of-fit/", response_model=GoodnessOfFitResponse)
 def get_fit_statistics(failure_type_code: str, num_objects: int, end_observation_period: date = '2016-06-30', number_of_bootstrap_samples: int = 100):
-    lifetimes = DATA_HANDLER.calculate_lifetimes(
+    lifetime_array, censoring_array = DATA_HANDLER.lifetime_arrays(
         failure_type_code, num_objects, end_observation_period)
-    return DATA_HANDLER.get_goodness_of_fit_statistics(lifetimes, number_of_bootstrap_samples)
+    if len(lifetime_array) == 0:
+        raise HTTPException(
+            status_code=400, detail="No lifetimes started before end_observation_period")
+    return DATA_HANDLER.get_goodness_of_fit_statistics_from_arrays(lifetime_array, censoring_array, number_of_bootstrap_samples)
+
+
+@app.get("/failure_rates/rolling/", response_model=RollingFailureRatesResponse)
+def get_rolling_failure_rates(failure_type_code: str, start: date, end: date, window_months: int = 12, num_objects: Optional[int] = None):
+    if window_months < 1:
+        raise HTTPException(
+            status_code=400, detail="window_months should be at least 1")
+    rates = DATA_HANDLER.get_rolling_failure_rates(
+        failure_type_code, start, end, window_months, num_objects)
+    return {"rates": rates}
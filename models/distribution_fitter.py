@@ -1,16 +1,37 @@
 # models/distribution_fitter.py
 
 import surpyval as sp
+from typing import Optional
 from data_processing.lifetime_processor import LifetimeProcessor
 
 
-def fit_distributions_to_data(data: list) -> dict:
+def fit_distributions_to_data(data: list, init: Optional[dict] = None) -> dict:
+    """
+    Fit Weibull and Exponential distributions to the lifetime data.
+
+    :param data: List of lifetime dictionaries as returned by calculate_lifetimes.
+    :param init: Optional initial parameters per distribution, e.g. the parameters of a
+                 previous fit ({"weibull": [alpha, beta], "exponential": [lambda_]}).
+    """
     processor = LifetimeProcessor(data)
     lifetime_array, censoring_array = processor.process_interval_censoring()
+    return fit_distributions_to_arrays(lifetime_array, censoring_array, init)
+
+
+def fit_distributions_to_arrays(lifetime_array, censoring_array, init: Optional[dict] = None) -> dict:
+    """
+    Fit Weibull and Exponential distributions to lifetime and censoring arrays,
+    e.g. the NumPy views returned by SnapshotReader.lifetime_arrays.
+
+    :param init: Optional initial parameters per distribution, as in fit_distributions_to_data.
+    """
+    init = init or {}
 
-    # Fit Weibull and Exponential distributions
-    weibull_fit = sp.Weibull.fit(lifetime_array, censoring_array)
-    exponential_fit = sp.Exponential.fit(lifetime_array, censoring_array)
+    # Fit Weibull and Exponential distributions, warm-started when initial values are given
+    weibull_kwargs = {"init": list(init["weibull"])} if init.get("weibull") is not None else {}
+    exponential_kwargs = {"init": list(init["exponential"])} if init.get("exponential") is not None else {}
+    weibull_fit = sp.Weibull.fit(lifetime_array, censoring_array, **weibull_kwargs)
+    exponential_fit = sp.Exponential.fit(lifetime_array, censoring_array, **exponential_kwargs)
 
     return {
         "weibull": weibull_fit,
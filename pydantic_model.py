@@ -114,7 +114,32 @@ class DistributionModelResponse(BaseModel):
     exponential: DistributionFitExponential
 
 
+class ObservationWindowFit(BaseModel):
+    end_observation_period: date
+    # Null when the lifetimes of the observation window cannot be fitted
+    weibull: Optional[DistributionFitWeibull]
+    exponential: Optional[DistributionFitExponential]
+
+
+class DistributionModelSweepResponse(BaseModel):
+    fits: List[ObservationWindowFit]
+
+
 class GoodnessOfFitResponse(BaseModel):
     weibull: GoodnessOfFit
     exponential: GoodnessOfFit
     general_information: GeneralInformation
+
+
+class RollingFailureRate(BaseModel):
+    period_start: date
+    period_end: date
+    number_of_failures: int
+    number_of_failed_components: int
+    number_of_objects: Optional[int]
+    failure_rate: float
+    failure_rate_per_component: Optional[float]
+
+
+class RollingFailureRatesResponse(BaseModel):
+    rates: List[RollingFailureRate]
@@ -0,0 +1,40 @@
+import os
+import sys
+import uuid
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+# Make the top-level modules importable and give the database configuration placeholder values,
+# the engines are created on import but the tests never connect to them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("LOCALHOST", "localhost")
+os.environ.setdefault("PORT", "5432")
+os.environ.setdefault("DATABASE_NAME", "componentLifetimeData")
+
+
+@pytest.fixture
+def postgres_engine():
+    """
+    Engine on an empty schema of the PostgreSQL database in TEST_DATABASE_URL, dropped after the test.
+    Tests using it are skipped when TEST_DATABASE_URL is not set or the database is not reachable.
+    """
+    url = os.getenv("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    schema = f"test_{uuid.uuid4().hex}"
+    admin_engine = create_engine(url)
+    try:
+        with admin_engine.begin() as connection:
+            connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    except OperationalError:
+        admin_engine.dispose()
+        pytest.skip("The database in TEST_DATABASE_URL is not reachable")
+
+    engine = create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+    yield engine
+    engine.dispose()
+    with admin_engine.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+    admin_engine.dispose()
@@ -0,0 +1,249 @@
+from datetime import date
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import data_model
+import data_handler
+from data_handler import ComponentDataHandler
+from models.distribution_fitter import fit_distributions_to_arrays
+
+
+def hours(value: date) -> float:
+    return (value - data_model.LIFETIME_EPOCH).total_seconds() / 3600.0
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Data handler reading from an in-memory database with a failure type on three objects."""
+    engine = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    data_model.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(data_handler.SessionFactory, "reader", session_factory)
+
+    session = session_factory()
+    session.add(data_model.FailureTypeCode(ID="f1", Code="LEAK", Description=""))
+    lifetimes = [
+        # Object o1 fails in 2014 and is observed again afterwards, object o2 only starts in 2013
+        ("l1", "o1", date(2010, 5, 20), date(2014, 1, 1)),
+        ("l2", "o1", date(2014, 1, 1), None),
+        ("l3", "o2", date(2013, 3, 1), None),
+    ]
+    for lifetime_id, object_id, start, end in lifetimes:
+        session.add(data_model.ObjectLifetime(
+            ID=lifetime_id, ObjectCodeID=object_id, StartDate=start, EndDate=end))
+        session.add(data_model.FailureTypeLifetimeSummary(
+            FailureTypeCodeID="f1", ObjectLifetimeID=lifetime_id, ObjectCodeID=object_id,
+            StartHours=hours(start), LifetimeHours=hours(end) - hours(start) if end else None,
+            Observable=True))
+    session.commit()
+    session.close()
+    return ComponentDataHandler()
+
+
+def test_add_months_clamps_day():
+    assert ComponentDataHandler._add_months(date(2012, 1, 31), 1) == date(2012, 2, 29)
+    assert ComponentDataHandler._add_months(date(2012, 11, 30), 3) == date(2013, 2, 28)
+    assert ComponentDataHandler._add_months(date(2012, 3, 1), -3) == date(2011, 12, 1)
+
+
+def test_observation_period_range():
+    assert ComponentDataHandler.observation_period_range(date(2010, 1, 31), date(2010, 5, 1), 2) == [
+        date(2010, 1, 31), date(2010, 3, 31)]
+    assert ComponentDataHandler.observation_period_range(date(2011, 1, 1), date(2010, 1, 1)) == []
+    with pytest.raises(ValueError):
+        ComponentDataHandler.observation_period_range(date(2010, 1, 1), date(2011, 1, 1), 0)
+
+
+def test_calculate_lifetimes_censors_failures_after_the_observation_period(handler):
+    lifetimes = handler.calculate_lifetimes("leak", 3, date(2012, 6, 30))
+    censored = hours(date(2012, 6, 30)) - hours(date(2010, 5, 20))
+    assert lifetimes == [{"lifetime": censored, "censoring": 1}] * 3
+
+
+@pytest.mark.parametrize("end_observation_period", [
+    date(2012, 6, 30), date(2013, 6, 30), date(2014, 1, 1), date(2016, 6, 30)])
+def test_sweep_step_matches_calculate_lifetimes(handler, end_observation_period):
+    sweep = handler.calculate_lifetime_sweep("leak", 3, [end_observation_period])
+    assert sweep[0]["lifetimes"] == handler.calculate_lifetimes(
+        "leak", 3, end_observation_period)
+
+
+def test_sweep_matches_calculate_lifetimes_at_every_step(handler):
+    periods = ComponentDataHandler.observation_period_range(
+        date(2012, 6, 30), date(2016, 6, 30), 6)
+    sweep = handler.calculate_lifetime_sweep("leak", 3, list(reversed(periods)))
+    assert [step["end_observation_period"] for step in sweep] == periods
+    for step in sweep:
+        assert len(step["lifetimes"]) >= 3
+        assert step["lifetimes"] == handler.calculate_lifetimes(
+            "leak", 3, step["end_observation_period"])
+
+
+def test_sweep_rejects_empty_period_list(handler):
+    with pytest.raises(ValueError):
+        handler.calculate_lifetime_sweep("leak", 3, [])
+
+
+def test_rolling_failure_rates_use_num_objects_as_population(handler):
+    session = data_handler.SessionFactory.reader()
+    session.add_all([
+        data_model.FailureTypeCodeChangeHistory(
+            ID="h1", FailureTypeCodeID="f1", FailureFrequency=2, NumberOfComponents=2, StartDate=date(2014, 1, 1)),
+        data_model.FailureTypeCodeChangeHistory(
+            ID="h2", FailureTypeCodeID="f1", FailureFrequency=1, NumberOfComponents=3, StartDate=date(2014, 3, 1)),
+    ])
+    session.commit()
+    session.close()
+
+    rates = handler.get_rolling_failure_rates("leak", date(2014, 2, 1), date(2014, 3, 1), 12, 10)
+    assert [rate["number_of_failures"] for rate in rates] == [2, 3]
+    assert [rate["number_of_failed_components"] for rate in rates] == [2, 3]
+    assert [rate["failure_rate_per_component"] for rate in rates] == [0.2, 0.3]
+
+    rates = handler.get_rolling_failure_rates("leak", date(2014, 2, 1), date(2014, 3, 1))
+    assert [rate["failure_rate"] for rate in rates] == [2.0, 3.0]
+    assert all(rate["failure_rate_per_component"] is None for rate in rates)
+
+
+def test_sweep_fit_skips_steps_without_failures(monkeypatch):
+    censored = {"lifetime_array": [5.0, 8.0], "censoring_array": [1, 1]}
+    with_failures = {"lifetime_array": [10.0, 20.0, 30.0], "censoring_array": [0, 0, 1]}
+    lifetime_series = [
+        dict(censored, end_observation_period=date(2010, 6, 30)),
+        dict(with_failures, end_observation_period=date(2011, 6, 30)),
+        dict(censored, end_observation_period=date(2012, 6, 30)),
+        dict(with_failures, end_observation_period=date(2013, 6, 30)),
+    ]
+    inits = []
+
+    def fit_spy(lifetime_array, censoring_array, init=None):
+        inits.append(init)
+        return fit_distributions_to_arrays(lifetime_array, censoring_array, init)
+    monkeypatch.setattr(data_handler, "fit_distributions_to_arrays", fit_spy)
+
+    results = ComponentDataHandler().get_fit_lifetime_distributions_sweep(lifetime_series)
+    assert [result["end_observation_period"] for result in results] == [
+        step["end_observation_period"] for step in lifetime_series]
+    assert results[0]["weibull"] is None and results[0]["exponential"] is None
+    assert results[1]["weibull"]["alpha"] > 0
+    assert results[2]["weibull"] is None
+    # Only the fitted second step warm-starts the later steps
+    assert inits[0] is None and inits[1] is None
+    assert inits[2] == inits[3] is not None
+
+
+def test_calculate_lifetimes_before_every_lifetime_start_is_empty(handler):
+    assert handler.calculate_lifetimes("leak", 8, date(2010, 1, 1)) == []
+
+
+def add_malfunctions(session, malfunctions):
+    for number, (object_id, failure_type_id, event_date, observable) in enumerate(
+            malfunctions, start=session.query(data_model.MalfunctionRecord).count()):
+        session.add(data_model.MalfunctionRecord(
+            ID=f"m{number}", MaintenanceGroupID="g1", MalfunctionNumber=number, ObjectCodeID=object_id,
+            Description="", EventDate=event_date, Observable=observable, FailureTypeCodeID=failure_type_id))
+    session.flush()
+
+
+@pytest.fixture
+def postgres_session(postgres_engine):
+    """Session on an empty PostgreSQL schema with two failure types, four objects and a maintenance group."""
+    data_model.Base.metadata.create_all(postgres_engine)
+    session = sessionmaker(bind=postgres_engine)()
+    session.add(data_model.MaintenanceGroup(ID="g1", Code="G", Description=""))
+    for failure_type_id in ["f1", "f2"]:
+        session.add(data_model.FailureTypeCode(ID=failure_type_id, Code=failure_type_id.upper(), Description=""))
+    for object_id in ["o1", "o2", "o3", "o4"]:
+        session.add(data_model.ObjectCode(ID=object_id, Code=object_id.upper(), Description=""))
+    session.flush()
+    yield session
+    session.close()
+
+
+def test_refresh_lifetime_summaries(postgres_session):
+    session = postgres_session
+    lifetimes = [
+        ("l1", "o1", date(2010, 5, 20), date(2014, 1, 1)),
+        ("l2", "o1", date(2014, 1, 1), None),
+        ("l3", "o2", date(2013, 3, 1), None),
+        ("l4", "o3", date(2012, 1, 1), None),
+    ]
+    for lifetime_id, object_id, start, end in lifetimes:
+        session.add(data_model.ObjectLifetime(ID=lifetime_id, ObjectCodeID=object_id, StartDate=start, EndDate=end))
+    # Object o1 has two failures of f1, which is observable because one of its failures is
+    add_malfunctions(session, [
+        ("o1", "f1", date(2014, 1, 1), False),
+        ("o1", "f1", date(2015, 2, 1), False),
+        ("o2", "f1", date(2016, 3, 1), True),
+        ("o3", "f2", date(2016, 3, 1), False),
+    ])
+    session.add(data_model.FailureTypeLifetimeSummary(
+        FailureTypeCodeID="f1", ObjectLifetimeID="stale", ObjectCodeID="o3", StartHours=0.0, Observable=False))
+    session.flush()
+
+    ComponentDataHandler._refresh_lifetime_summaries(session, ["f1", "f2", None])
+
+    rows = session.query(
+        data_model.FailureTypeLifetimeSummary.FailureTypeCodeID,
+        data_model.FailureTypeLifetimeSummary.ObjectLifetimeID,
+        data_model.FailureTypeLifetimeSummary.StartHours,
+        data_model.FailureTypeLifetimeSummary.LifetimeHours,
+        data_model.FailureTypeLifetimeSummary.Observable).order_by(
+        data_model.FailureTypeLifetimeSummary.FailureTypeCodeID,
+        data_model.FailureTypeLifetimeSummary.ObjectLifetimeID).all()
+    assert rows == [
+        ("f1", "l1", hours(date(2010, 5, 20)), hours(date(2014, 1, 1)) - hours(date(2010, 5, 20)), True),
+        ("f1", "l2", hours(date(2014, 1, 1)), None, True),
+        ("f1", "l3", hours(date(2013, 3, 1)), None, True),
+        ("f2", "l4", hours(date(2012, 1, 1)), None, False),
+    ]
+
+
+def failure_rate_history(session):
+    return session.query(
+        data_model.FailureTypeCodeChangeHistory.StartDate,
+        data_model.FailureTypeCodeChangeHistory.EndDate,
+        data_model.FailureTypeCodeChangeHistory.FailureFrequency,
+        data_model.FailureTypeCodeChangeHistory.NumberOfComponents).filter_by(
+        FailureTypeCodeID="f1").order_by(data_model.FailureTypeCodeChangeHistory.StartDate).all()
+
+
+def test_refresh_failure_rate_history(postgres_session):
+    session = postgres_session
+    add_malfunctions(session, [
+        ("o1", "f1", date(2011, 1, 5), True),
+        ("o1", "f1", date(2011, 1, 20), True),
+        ("o2", "f1", date(2011, 3, 10), True),
+        ("o1", "f1", date(2011, 3, 15), True),
+        ("o3", "f1", date(2011, 4, 1), True),
+        ("o4", "f2", date(2011, 2, 1), True),
+    ])
+    ComponentDataHandler._refresh_failure_rate_history(session, ["f1", "f2"])
+    assert failure_rate_history(session) == [
+        (date(2011, 1, 1), date(2011, 2, 1), 2.0, 1),
+        (date(2011, 3, 1), date(2011, 4, 1), 2.0, 2),
+        (date(2011, 4, 1), date(2011, 5, 1), 1.0, 3),
+    ]
+    january_id = session.query(data_model.FailureTypeCodeChangeHistory.ID).filter_by(
+        FailureTypeCodeID="f1", StartDate=date(2011, 1, 1)).scalar()
+
+    # Only the months from February onwards are replaced, the count continues from January
+    add_malfunctions(session, [
+        ("o4", "f1", date(2011, 2, 2), True),
+        ("o1", "f1", date(2011, 3, 25), True),
+    ])
+    ComponentDataHandler._refresh_failure_rate_history(session, ["f1"], date(2011, 2, 2))
+    incremental = failure_rate_history(session)
+    assert incremental == [
+        (date(2011, 1, 1), date(2011, 2, 1), 2.0, 1),
+        (date(2011, 2, 1), date(2011, 3, 1), 1.0, 2),
+        (date(2011, 3, 1), date(2011, 4, 1), 3.0, 3),
+        (date(2011, 4, 1), date(2011, 5, 1), 1.0, 4),
+    ]
+    assert session.query(data_model.FailureTypeCodeChangeHistory.ID).filter_by(
+        FailureTypeCodeID="f1", StartDate=date(2011, 1, 1)).scalar() == january_id
+
+    ComponentDataHandler._refresh_failure_rate_history(session, ["f1"])
+    assert failure_rate_history(session) == incremental
@@ -0,0 +1,54 @@
+import pytest
+from fastapi.testclient import TestClient
+import fast_api_app
+
+
+@pytest.fixture
+def client():
+    return TestClient(fast_api_app.app)
+
+
+def test_sweep_without_periods_is_bad_request(client):
+    response = client.get("/distribution_model/fit_parameters/sweep/",
+                          params={"failure_type_code": "LEAK", "num_objects": 3})
+    assert response.status_code == 400
+
+
+def test_sweep_with_reversed_range_is_bad_request(client):
+    response = client.get("/distribution_model/fit_parameters/sweep/", params={
+        "failure_type_code": "LEAK", "num_objects": 3,
+        "observation_start": "2016-06-30", "observation_end": "2010-06-30"})
+    assert response.status_code == 400
+
+
+def test_rolling_failure_rates_with_empty_window_is_bad_request(client):
+    response = client.get("/failure_rates/rolling/", params={
+        "failure_type_code": "LEAK", "start": "2014-01-01", "end": "2014-06-30", "window_months": 0})
+    assert response.status_code == 400
+
+
+def test_sweep_returns_null_fit_for_steps_without_failures(client, monkeypatch):
+    lifetime_series = [
+        {"end_observation_period": "2012-06-30",
+         "lifetimes": [{"lifetime": 5.0, "censoring": 1}, {"lifetime": 8.0, "censoring": 1}]},
+        {"end_observation_period": "2016-06-30",
+         "lifetimes": [{"lifetime": 10.0, "censoring": 0}, {"lifetime": 20.0, "censoring": 0},
+                       {"lifetime": 30.0, "censoring": 1}]},
+    ]
+    monkeypatch.setattr(fast_api_app.DATA_HANDLER, "calculate_lifetime_sweep",
+                        lambda *args: lifetime_series)
+    response = client.get("/distribution_model/fit_parameters/sweep/", params={
+        "failure_type_code": "LEAK", "num_objects": 3,
+        "observation_start": "2012-06-30", "observation_end": "2016-06-30", "step_months": 48})
+    assert response.status_code == 200
+    fits = response.json()["fits"]
+    assert fits[0]["weibull"] is None and fits[0]["exponential"] is None
+    assert fits[1]["weibull"] is not None
+
+
+@pytest.mark.parametrize("path", ["/distribution_model/fit_parameters/", "/distribution_model/goodness-of-fit/"])
+def test_fit_of_empty_observation_window_is_bad_request(client, monkeypatch, path):
+    monkeypatch.setattr(fast_api_app.DATA_HANDLER, "calculate_lifetimes", lambda *args: [])
+    response = client.get(path, params={
+        "failure_type_code": "LEAK", "num_objects": 3, "end_observation_period": "1980-01-01"})
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+import math
+import numpy as np
+import pytest
+from data_processing.lifetime_window import LifetimeWindowSweep, unobserved_lifetime, window_lifetimes, window_masks
+
+
+def test_window_masks_censor_lifetimes_ending_after_window():
+    in_window, ended = window_masks([0.0, 0.0, 10.0, 50.0], [5.0, 20.0, None, 1.0], 15.0)
+    assert in_window.tolist() == [True, True, True, False]
+    assert ended.tolist() == [True, False, False, False]
+
+
+def test_window_masks_accept_nan_for_open_lifetimes():
+    _, ended = window_masks([0.0], [math.nan], 15.0)
+    assert ended.tolist() == [False]
+
+
+def test_window_lifetimes_observable():
+    lifetimes = window_lifetimes(
+        start_hours=[0.0, 5.0, 0.0, 40.0], lifetime_hours=[5.0, None, 30.0, None],
+        interval_start_hours=[None] * 4, interval_end_hours=[None] * 4,
+        object_ids=["a", "a", "b", "c"], observable=True, num_objects=4,
+        earliest_start_hours=0.0, end_hours=20.0)
+    assert lifetimes == [
+        {"lifetime": 5.0, "censoring": 0},
+        {"lifetime": 15.0, "censoring": 1},
+        {"lifetime": 20.0, "censoring": 1},
+        # Object c starts after the window and the fourth object has no lifetimes
+        {"lifetime": 20.0, "censoring": 1},
+        {"lifetime": 20.0, "censoring": 1},
+    ]
+
+
+def test_window_lifetimes_non_observable_are_interval_censored():
+    lifetimes = window_lifetimes(
+        start_hours=[0.0], lifetime_hours=[10.0], interval_start_hours=[4.0], interval_end_hours=[10.0],
+        object_ids=["a"], observable=False, num_objects=1, earliest_start_hours=0.0, end_hours=20.0)
+    assert lifetimes == [{"lifetime": [4.0, 10.0], "censoring": 2}]
+
+
+def test_window_lifetimes_without_lifetimes_in_window_is_empty():
+    lifetimes = window_lifetimes(
+        start_hours=[40.0], lifetime_hours=[None], interval_start_hours=[None], interval_end_hours=[None],
+        object_ids=["a"], observable=True, num_objects=3, earliest_start_hours=None, end_hours=20.0)
+    assert lifetimes == []
+    assert unobserved_lifetime(40.0, 20.0) is None
+    assert unobserved_lifetime(5.0, 20.0) == 15.0
+
+
+def reference_lifetimes(start_hours, lifetime_hours, interval_start_hours, interval_end_hours,
+                        object_ids, observable, num_objects, earliest_start_hours, end_hours):
+    """Lifetimes of a single window, selected row by row with window_masks."""
+    in_window, ended = window_masks(start_hours, lifetime_hours, end_hours)
+    lifetimes = []
+    for i in np.flatnonzero(in_window):
+        if not ended[i]:
+            lifetimes.append((float(end_hours - start_hours[i]), 1))
+        elif observable:
+            lifetimes.append((float(lifetime_hours[i]), 0))
+        else:
+            lifetimes.append(((float(interval_start_hours[i]), float(interval_end_hours[i])), 2))
+    unobserved_count = num_objects - len(set(np.asarray(object_ids)[in_window]))
+    lifetime = unobserved_lifetime(earliest_start_hours, end_hours)
+    if unobserved_count > 0 and lifetime is not None:
+        lifetimes.extend([(lifetime, 1)] * unobserved_count)
+    return sorted(lifetimes, key=repr)
+
+
+@pytest.mark.parametrize("observable", [True, False])
+def test_sweep_matches_reference_at_every_window(observable):
+    rng = np.random.default_rng(7)
+    start_hours = rng.uniform(0.0, 1000.0, 200)
+    lifetime_hours = np.where(rng.random(200) < 0.3, np.nan, rng.uniform(0.0, 500.0, 200))
+    interval_start_hours = lifetime_hours * 0.5
+    interval_end_hours = lifetime_hours
+    object_ids = rng.integers(0, 60, 200)
+    earliest_start_hours = float(start_hours.min())
+
+    sweep = LifetimeWindowSweep(start_hours, lifetime_hours, interval_start_hours, interval_end_hours,
+                                object_ids, observable, 80, earliest_start_hours)
+    for end_hours in [-5.0, 100.0, 100.0, 400.0, 850.0, 1600.0]:
+        lifetimes = sorted([
+            (tuple(entry["lifetime"]) if entry["censoring"] == 2 else entry["lifetime"], entry["censoring"])
+            for entry in sweep.lifetimes(end_hours)], key=repr)
+        assert lifetimes == reference_lifetimes(
+            start_hours, lifetime_hours, interval_start_hours, interval_end_hours,
+            object_ids, observable, 80, earliest_start_hours, end_hours)
+
+
+def test_sweep_rejects_decreasing_window_ends():
+    sweep = LifetimeWindowSweep([0.0], [None], [None], [None], ["a"], True, 1, 0.0)
+    sweep.lifetimes(10.0)
+    with pytest.raises(ValueError):
+        sweep.lifetimes(5.0)
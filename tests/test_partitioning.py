@@ -0,0 +1,70 @@
+from datetime import date
+from sqlalchemy import text
+import data_model
+from database.partitioning import create_year_partitions, downgrade_from_partitioned, upgrade_to_partitioned
+
+
+def table_kind(connection, table_name: str) -> str:
+    return connection.execute(text(
+        "SELECT relkind FROM pg_class WHERE oid = CAST(:table_name AS regclass)"),
+        {"table_name": f'"{table_name}"'}).scalar()
+
+
+def index_names(connection, table_name: str) -> set:
+    return set(connection.execute(text(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table_name"),
+        {"table_name": table_name}).scalars())
+
+
+def fill_tables(connection):
+    connection.execute(text(
+        """INSERT INTO "ObjectCode" ("ID", "Code", "Description") VALUES ('o1', 'O1', '')"""))
+    connection.execute(text(
+        """INSERT INTO "FailureTypeCode" ("ID", "Code", "Description") VALUES ('f1', 'LEAK', '')"""))
+    connection.execute(text(
+        """INSERT INTO "MaintenanceGroup" ("ID", "Code", "Description") VALUES ('g1', 'G', '')"""))
+    connection.execute(text(
+        """INSERT INTO "MalfunctionRecord" ("ID", "MaintenanceGroupID", "MalfunctionNumber", "ObjectCodeID",
+                                            "Description", "EventDate", "Observable", "FailureTypeCodeID")
+           VALUES ('m1', 'g1', 1, 'o1', '', :event_date, true, 'f1')"""), {"event_date": date(2011, 3, 1)})
+    connection.execute(text(
+        """INSERT INTO "ObjectLifetime" ("ID", "ObjectCodeID", "StartDate", "EndDate")
+           VALUES ('l1', 'o1', :start, :end), ('l2', 'o1', :end, NULL)"""),
+        {"start": date(2005, 5, 20), "end": date(2011, 3, 1)})
+
+
+def test_upgrade_and_downgrade_keep_the_indexes(postgres_engine):
+    data_model.Base.metadata.create_all(postgres_engine)
+    with postgres_engine.begin() as connection:
+        fill_tables(connection)
+        assert "ix_ObjectLifetime_StartDate" in index_names(connection, "ObjectLifetime")
+
+        upgrade_to_partitioned(connection, 2010, 2012)
+        assert table_kind(connection, "ObjectLifetime") == "p"
+        assert {"ix_ObjectLifetime_StartDate", "ix_ObjectLifetime_ObjectCodeID"} <= index_names(
+            connection, "ObjectLifetime")
+        assert "ix_MalfunctionRecord_FailureTypeCodeID" in index_names(connection, "MalfunctionRecord")
+        assert connection.execute(text('SELECT count(*) FROM "ObjectLifetime"')).scalar() == 2
+
+        downgrade_from_partitioned(connection)
+        assert table_kind(connection, "ObjectLifetime") == "r"
+        assert {"ix_ObjectLifetime_StartDate", "ix_ObjectLifetime_ObjectCodeID"} <= index_names(
+            connection, "ObjectLifetime")
+        assert "ix_MalfunctionRecord_FailureTypeCodeID" in index_names(connection, "MalfunctionRecord")
+        assert connection.execute(text('SELECT count(*) FROM "ObjectLifetime"')).scalar() == 2
+
+
+def test_rows_without_a_yearly_partition_go_to_the_default_partition(postgres_engine):
+    data_model.Base.metadata.create_all(postgres_engine)
+    with postgres_engine.begin() as connection:
+        upgrade_to_partitioned(connection, 2010, 2012)
+        fill_tables(connection)
+        # The lifetime starting in 2005 has no yearly partition
+        assert connection.execute(text('SELECT "ID" FROM "ObjectLifetime_default"')).scalars().all() == ["l1"]
+
+        create_year_partitions(connection, "ObjectLifetime", [2005])
+        assert connection.execute(text('SELECT count(*) FROM "ObjectLifetime_default"')).scalar() == 0
+        assert connection.execute(text('SELECT "ID" FROM "ObjectLifetime_2005"')).scalars().all() == ["l1"]
+        assert {"ObjectLifetime_2005_pkey", "ObjectLifetime_2005_StartDate_idx"} <= index_names(
+            connection, "ObjectLifetime_2005")
+        assert connection.execute(text('SELECT count(*) FROM "ObjectLifetime"')).scalar() == 2
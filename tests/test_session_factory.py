@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from sqlalchemy import create_engine
+from database.session_factory import RoutingSessionFactory, _parse_lsn
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, statement):
+        self.engine.statements.append(str(statement))
+        return self
+
+    def scalar(self):
+        return self.engine.replayed_lsn
+
+
+class FakeReplicaEngine:
+    """Stands in for a replica engine, with a replay location and an up/down switch."""
+
+    def __init__(self, host):
+        self.url = create_engine(f"postgresql://user@{host}/db").url
+        self.replayed_lsn = "0/0"
+        self.down = False
+        self.statements = []
+
+    @contextmanager
+    def connect(self):
+        if self.down:
+            raise ConnectionError("replica down")
+        yield FakeConnection(self)
+
+
+def routing_factory(replicas, read_your_writes=True, healthy_interval=0.0):
+    factory = RoutingSessionFactory(
+        create_engine("sqlite://"), replicas, retry_interval=60.0, read_your_writes=read_your_writes,
+        healthy_interval=healthy_interval)
+    # Sessions are never used to query, so the replica sessionmakers only need to tell the replicas apart
+    factory.replicas = [lambda replica=replica: replica for replica in replicas]
+    return factory
+
+
+def test_parse_lsn():
+    assert _parse_lsn("0/10") == 16
+    assert _parse_lsn("1/0") == 1 << 32
+
+
+def test_reader_round_robin():
+    replicas = [FakeReplicaEngine("a"), FakeReplicaEngine("b")]
+    factory = routing_factory(replicas)
+    assert [factory.reader() for _ in range(3)] == [replicas[0], replicas[1], replicas[0]]
+
+
+def test_reader_skips_lagging_replica():
+    replicas = [FakeReplicaEngine("a"), FakeReplicaEngine("b")]
+    replicas[1].replayed_lsn = "0/20"
+    factory = routing_factory(replicas)
+    factory._written_lsn = _parse_lsn("0/20")
+    assert [factory.reader() for _ in range(2)] == [replicas[1], replicas[1]]
+
+
+def test_reader_checks_caught_up_replica_that_went_down():
+    replica = FakeReplicaEngine("a")
+    replica.replayed_lsn = "0/20"
+    factory = routing_factory([replica])
+    factory._written_lsn = _parse_lsn("0/20")
+    assert factory.reader() is replica
+
+    replica.down = True
+    session = factory.reader()
+    assert session is not replica
+    # Marked unhealthy, so it is skipped without checking it again
+    replica.down = False
+    checks = len(replica.statements)
+    assert factory.reader() is not replica
+    assert len(replica.statements) == checks
+
+
+def test_reader_caches_passed_liveness_check():
+    replica = FakeReplicaEngine("a")
+    factory = routing_factory([replica], healthy_interval=60.0)
+    assert [factory.reader() for _ in range(3)] == [replica] * 3
+    assert len(replica.statements) == 1
+
+    # A write the replica has not been seen to replay is still checked on every read
+    replica.replayed_lsn = "0/10"
+    factory._written_lsn = _parse_lsn("0/20")
+    assert factory.reader() is not replica
+    assert factory.reader() is not replica
+    assert len(replica.statements) == 3
@@ -0,0 +1,135 @@
+from datetime import date
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import data_model
+import data_handler
+from data_handler import ComponentDataHandler
+from data_processing.snapshot import SnapshotReader, export_snapshot
+
+LIFETIMES = [
+    ("l1", "o1", date(2010, 5, 20), date(2014, 1, 1)),
+    ("l2", "o1", date(2014, 1, 1), None),
+    ("l3", "o2", date(2013, 3, 1), None),
+    ("l4", "o3", date(2010, 5, 20), None),
+]
+
+
+def hours(value: date) -> float:
+    return (value - data_model.LIFETIME_EPOCH).total_seconds() / 3600.0
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """In-memory database with a failure type on objects o1 and o2, and an unaffected object o3."""
+    engine = create_engine("sqlite://", poolclass=StaticPool,
+                           connect_args={"check_same_thread": False})
+    data_model.Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(data_handler.SessionFactory, "reader", session_factory)
+
+    session = session_factory()
+    session.add_all([
+        data_model.FailureTypeCode(ID="f1", Code="LEAK", Description=""),
+        data_model.MaintenanceGroup(ID="g1", Code="G", Description=""),
+    ] + [data_model.ObjectCode(ID=object_id, Code=object_id.upper(), Description="")
+         for object_id in ["o1", "o2", "o3"]])
+    for number, object_id in enumerate(["o1", "o2"]):
+        session.add(data_model.MalfunctionRecord(
+            ID=f"m{number}", MaintenanceGroupID="g1", MalfunctionNumber=number, ObjectCodeID=object_id,
+            Description="", EventDate=date(2014, 1, 1), Observable=True, FailureTypeCodeID="f1"))
+    for lifetime_id, object_id, start, end in LIFETIMES:
+        session.add(data_model.ObjectLifetime(
+            ID=lifetime_id, ObjectCodeID=object_id, StartDate=start, EndDate=end))
+        if object_id != "o3":
+            session.add(data_model.FailureTypeLifetimeSummary(
+                FailureTypeCodeID="f1", ObjectLifetimeID=lifetime_id, ObjectCodeID=object_id,
+                StartHours=hours(start), LifetimeHours=hours(end) - hours(start) if end else None,
+                Observable=True))
+    session.commit()
+    session.close()
+    return session_factory
+
+
+@pytest.fixture
+def snapshot_directory(session_factory, tmp_path):
+    session = session_factory()
+    export_snapshot(session, str(tmp_path / "snapshot"))
+    session.close()
+    return str(tmp_path / "snapshot")
+
+
+@pytest.mark.parametrize("end_observation_period", [
+    date(2010, 1, 1), date(2012, 6, 30), date(2013, 6, 30), date(2016, 6, 30)])
+def test_offline_lifetimes_match_database(session_factory, snapshot_directory, end_observation_period):
+    online = ComponentDataHandler().calculate_lifetimes(
+        "leak", 4, end_observation_period)
+    offline = ComponentDataHandler(snapshot_directory=snapshot_directory).calculate_lifetimes(
+        "leak", 4, end_observation_period)
+    assert sorted(offline, key=str) == sorted(online, key=str)
+
+
+@pytest.mark.parametrize("end_observation_period", [date(2010, 1, 1), date(2016, 6, 30)])
+def test_lifetime_arrays_match_lifetimes(snapshot_directory, end_observation_period):
+    reader = SnapshotReader(snapshot_directory)
+    lifetimes = reader.calculate_lifetimes("LEAK", 4, end_observation_period)
+    lifetime_array, censoring_array = reader.lifetime_arrays(
+        "LEAK", 4, end_observation_period)
+    assert sorted(zip(lifetime_array.tolist(), censoring_array.tolist())) == sorted(
+        (entry["lifetime"], entry["censoring"]) for entry in lifetimes)
+
+
+def test_lifetime_columns_are_zero_copy_views(snapshot_directory):
+    columns = SnapshotReader(snapshot_directory).lifetime_columns("leak")
+    assert not columns["start_hours"].flags.owndata
+    assert np.isnan(columns["lifetime_hours"]).sum() == 2
+
+
+def test_export_refuses_non_empty_directory(session_factory, snapshot_directory):
+    session = session_factory()
+    with pytest.raises(ValueError):
+        export_snapshot(session, snapshot_directory)
+    session.close()
+
+
+def test_export_writes_every_lifetime_once(snapshot_directory):
+    import pyarrow.dataset as ds
+    lifetimes = ds.dataset(f"{snapshot_directory}/ObjectLifetime", partitioning="hive").to_table()
+    assert sorted(lifetimes.column("ID").to_pylist()) == ["l1", "l2", "l3", "l4"]
+
+
+def test_export_keeps_column_types_of_null_only_batches(session_factory, tmp_path, monkeypatch):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from data_processing import snapshot
+    # Lifetimes l3 and l4 form a batch without end dates
+    monkeypatch.setattr(snapshot, "EXPORT_BATCH_SIZE", 2)
+    session = session_factory()
+    export_snapshot(session, str(tmp_path / "snapshot"))
+    session.close()
+
+    lifetimes = ds.dataset(str(tmp_path / "snapshot" / "ObjectLifetime"), partitioning="hive").to_table()
+    assert lifetimes.num_rows == 4
+    assert lifetimes.schema.field("EndDate").type == pa.date32()
+    assert lifetimes.schema.field("IntervalStart").type == pa.date32()
+    malfunctions = pq.read_table(str(tmp_path / "snapshot" / "MalfunctionRecord"))
+    assert malfunctions.num_rows == 2
+
+
+def test_offline_fits_read_the_snapshot_arrays(session_factory, snapshot_directory, monkeypatch):
+    online = ComponentDataHandler()
+    offline = ComponentDataHandler(snapshot_directory=snapshot_directory)
+    # The offline fit paths never build a list of lifetimes
+    monkeypatch.setattr(SnapshotReader, "calculate_lifetimes", None)
+
+    lifetime_array, censoring_array = offline.lifetime_arrays("leak", 4, date(2016, 6, 30))
+    online_lifetime_array, online_censoring_array = online.lifetime_arrays("leak", 4, date(2016, 6, 30))
+    assert sorted(zip(lifetime_array.tolist(), censoring_array.tolist())) == sorted(
+        zip(online_lifetime_array, online_censoring_array))
+
+    sweep = offline.lifetime_array_sweep("leak", 4, [date(2016, 6, 30), date(2012, 6, 30)])
+    assert [step["end_observation_period"] for step in sweep] == [date(2012, 6, 30), date(2016, 6, 30)]
+    assert sweep[1]["lifetime_array"].tolist() == lifetime_array.tolist()